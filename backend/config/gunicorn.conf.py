@@ -0,0 +1,11 @@
+# backend/config/gunicorn.conf.py
+# gunicorn -c config/gunicorn.conf.py config.wsgi
+# Everything else (bind, workers, ...) comes from the command line or GUNICORN_CMD_ARGS.
+
+
+def post_worker_init(worker):
+    # Database sockets must not be inherited across the fork (--preload),
+    # so each worker opens its own once the application is loaded
+    from django.apps import apps
+
+    apps.get_app_config('core').warm_up_connections()
@@ -1,22 +1,22 @@
 # backend/config/urls.py
+from django.conf import settings
 from django.urls import path, include
-from django.contrib import admin
 from rest_framework.routers import DefaultRouter
-from users.views import AuthViewSet, PasswordResetViewSet, EmailVerificationView
-from core.views import CurrentUserView
-from django.http import JsonResponse
-
-# Import for DRF Spectacular (API documentation)
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularSwaggerView,
-    SpectacularRedocView
+from users.views import (
+    AuthViewSet,
+    PasswordResetViewSet,
+    EmailVerificationView,
+    InvalidationMetricsView,
+    AuditMetricsView
 )
+from core.views import CurrentUserView, ExampleModelViewSet
+from django.http import JsonResponse
 
 # API Router
 router = DefaultRouter()
 router.register(r'auth', AuthViewSet, basename='auth')
 router.register(r'reset-password', PasswordResetViewSet, basename='password-reset')
+router.register(r'examples', ExampleModelViewSet, basename='example')
 
 def index(request):
     return JsonResponse({
@@ -26,15 +26,31 @@ def index(request):
 
 urlpatterns = [
     path('', index),
-    path('admin/', admin.site.urls),
     
     # API Routes
     path('api/', include(router.urls)),
     path('api/user/', CurrentUserView.as_view(), name='current-user'),
-    path('api/verify-email/<str:token>/', EmailVerificationView.as_view(), name='verify-email'),
+    path('api/verify-email/<uuid:token>/', EmailVerificationView.as_view(), name='verify-email'),
+    path('api/metrics/invalidation/', InvalidationMetricsView.as_view(), name='invalidation-metrics'),
+    path('api/metrics/audit/', AuditMetricsView.as_view(), name='audit-metrics'),
+]
+
+if settings.ADMIN_ENABLED:
+    from django.contrib import admin
+    
+    urlpatterns.append(path('admin/', admin.site.urls))
+
+if settings.API_DOCS_ENABLED:
+    # Import for DRF Spectacular (API documentation)
+    from drf_spectacular.views import (
+        SpectacularSwaggerView,
+        SpectacularRedocView
+    )
+    from core.schema import schema_view
     
-    # API Documentation
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('api/docs/swagger/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
-    path('api/docs/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
-]
\ No newline at end of file
+    urlpatterns += [
+        # Served from memory, see core.schema
+        path('api/schema/', schema_view, name='schema'),
+        path('api/docs/swagger/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
+        path('api/docs/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
+    ]
@@ -1,3 +1,86 @@
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.views.main import SEARCH_VAR
+from django.http import HttpResponseRedirect, QueryDict
+from .models import ExampleModel
+from .sharding import fan_out, sharding_enabled
 
-# Register your models here.
+
+class ShardListFilter(admin.SimpleListFilter):
+    """
+    Shard picker for the changelist; each choice shows the number of rows on that shard
+    matching the current search, so a search covers every shard
+    """
+    title = 'shard'
+    parameter_name = 'shard'
+
+    def lookups(self, request, model_admin):
+        counts = [(shard, queryset.count()) for shard, queryset in model_admin.fan_out_search(request)]
+        return [(shard, f'{shard} ({count})') for shard, count in counts]
+
+    def choices(self, changelist):
+        # No "All" entry: a changelist can only query one database
+        for lookup, title in self.lookup_choices:
+            yield {
+                'selected': self.value() == lookup,
+                'query_string': changelist.get_query_string({self.parameter_name: lookup}),
+                'display': title,
+            }
+
+    def queryset(self, request, queryset):
+        # Applied in ShardedModelAdmin.get_queryset, which also covers the change/delete views
+        return queryset
+
+
+class ShardedModelAdmin(admin.ModelAdmin):
+    """
+    Admin for BaseModel-derived models: reads go to the shard chosen in the changelist
+    (kept in the change view through the preserved changelist filters), writes follow the owner.
+    """
+    def get_shard(self, request):
+        shard = request.GET.get(ShardListFilter.parameter_name)
+        if shard is None:
+            shard = QueryDict(request.GET.get('_changelist_filters', '')).get(ShardListFilter.parameter_name)
+        return shard if shard in settings.SHARD_DATABASES else settings.SHARD_DATABASES[0]
+
+    def fan_out_search(self, request):
+        """
+        The changelist search on every shard
+        """
+        queryset, _ = self.get_search_results(request, self.model.objects.all(), request.GET.get(SEARCH_VAR, ''))
+        return fan_out(queryset)
+
+    def changelist_view(self, request, extra_context=None):
+        if sharding_enabled() and request.GET.get(ShardListFilter.parameter_name) not in settings.SHARD_DATABASES:
+            # Name the shard in the URL instead of silently listing the first one:
+            # the first shard with search matches, or the first shard
+            shards = [shard for shard, queryset in self.fan_out_search(request) if queryset.exists()]
+            query = request.GET.copy()
+            query[ShardListFilter.parameter_name] = (shards or settings.SHARD_DATABASES)[0]
+            return HttpResponseRedirect(f'{request.path}?{query.urlencode()}')
+        return super().changelist_view(request, extra_context)
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if sharding_enabled():
+            queryset = queryset.using(self.get_shard(request))
+        return queryset
+
+    def get_list_filter(self, request):
+        list_filter = super().get_list_filter(request)
+        if sharding_enabled():
+            list_filter = [ShardListFilter, *list_filter]
+        return list_filter
+
+    def get_readonly_fields(self, request, obj=None):
+        readonly_fields = super().get_readonly_fields(request, obj)
+        # Changing the owner would require moving the row to another shard
+        if obj is not None and sharding_enabled():
+            readonly_fields = [*readonly_fields, 'owner']
+        return readonly_fields
+
+
+@admin.register(ExampleModel)
+class ExampleModelAdmin(ShardedModelAdmin):
+    list_display = ['id', 'name', 'owner_id', 'created_at']
+    search_fields = ['name']
@@ -1,6 +1,50 @@
+import logging
 from django.apps import AppConfig
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        if settings.WARMUP_ON_STARTUP:
+            self.warm_up()
+
+    def warm_up(self):
+        """
+        Populate the URL resolver and load serializers and the OpenAPI schema.
+        Runs last, since core is the last installed app. Only builds in-memory state,
+        so it is safe before a fork (gunicorn --preload); see warm_up_connections().
+        """
+        from django.urls import get_resolver
+        from .schema import get_schema
+        from .serializers import ExampleModelSerializer
+
+        get_resolver().reverse_dict
+        ExampleModelSerializer().fields
+        if settings.API_DOCS_ENABLED:
+            get_schema()
+
+    def warm_up_connections(self):
+        """
+        Open this thread's connection to every database that keeps connections between
+        requests (CONN_MAX_AGE != 0; others are closed after the first request anyway).
+        Call it in each worker after the fork, e.g. from gunicorn's post_worker_init
+        (config/gunicorn.conf.py): a socket opened before it would be shared by every worker.
+        """
+        from django.db import connections
+
+        if not settings.WARMUP_ON_STARTUP:
+            return
+        for alias in connections:
+            if not connections[alias].settings_dict.get('CONN_MAX_AGE'):
+                continue
+            try:
+                connections[alias].ensure_connection()
+            except Exception:
+                logger.warning('Warm-up could not connect to database %r', alias, exc_info=True)
@@ -0,0 +1,99 @@
+# backend/core/compression.py
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:  # optional dependency, gzip only without it
+    brotli = None
+
+# Formats that are already compressed gain nothing from another pass
+COMPRESSIBLE_EXTENSIONS = {
+    '.css', '.js', '.mjs', '.map', '.json', '.html', '.htm', '.svg', '.txt', '.xml', '.ico', '.wasm',
+    '.ttf', '.otf', '.eot',
+}
+COMPRESSIBLE_CONTENT_TYPES = (
+    'text/', 'application/json', 'application/javascript', 'application/xml', 'application/vnd.oai.openapi',
+    'image/svg+xml',
+)
+
+# Variant suffix per Content-Encoding, in order of preference
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')] if brotli is not None else [('gzip', '.gz')]
+
+
+def compress(data, encoding, level=None):
+    if encoding == 'br':
+        return brotli.compress(data, quality=11 if level is None else level)
+    return gzip.compress(data, compresslevel=9 if level is None else level, mtime=0)
+
+
+def accepted_encodings(header):
+    """
+    Content-Encodings from an Accept-Encoding header, without the ones refused with q=0
+    """
+    accepted = set()
+    for item in header.split(','):
+        coding, *params = [part.strip() for part in item.split(';')]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding and q > 0:
+            accepted.add(coding.lower())
+    return accepted
+
+
+def choose_encoding(header, available):
+    accepted = accepted_encodings(header)
+    for encoding, _ in ENCODINGS:
+        if encoding in accepted and encoding in available:
+            return encoding
+    return None
+
+
+def compress_file(path, min_size=256, max_ratio=0.95):
+    """
+    Write .br/.gz variants next to `path` at maximum compression, skipping files that are
+    too small, not compressible or that would not shrink below max_ratio of their size.
+    Returns the paths written.
+    """
+    if os.path.splitext(path)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+        return []
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < min_size:
+        return []
+
+    written = []
+    for encoding, suffix in ENCODINGS:
+        compressed = compress(data, encoding)
+        if len(compressed) <= len(data) * max_ratio:
+            with open(path + suffix, 'wb') as f:
+                f.write(compressed)
+            written.append(path + suffix)
+    return written
+
+
+def compress_directory(root, force=False):
+    """
+    compress_file() every file under `root` whose variants are missing or older than the file
+    (e.g. a Vite build in FRONTEND_DIST_DIR). Returns the paths written.
+    """
+    suffixes = tuple(suffix for _, suffix in ENCODINGS)
+    written = []
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            if filename.endswith(('.gz', '.br')) and os.path.exists(os.path.splitext(path)[0]):
+                continue
+            mtime = os.path.getmtime(path)
+            up_to_date = all(
+                os.path.exists(path + suffix) and os.path.getmtime(path + suffix) >= mtime for suffix in suffixes
+            )
+            if force or not up_to_date:
+                written.extend(compress_file(path))
+    return written
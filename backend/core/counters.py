@@ -0,0 +1,36 @@
+# backend/core/counters.py
+from django.db import models
+
+
+class RowCountQuerySet(models.QuerySet):
+    """
+    Queries on core.models.OwnerRowCount. Call with .using(shard): counters live
+    on the same database as the rows they count.
+    """
+    def adjust(self, model, deltas):
+        """
+        Add {owner_id: delta} to the counters of `model`, creating missing ones.
+        Call it inside the transaction that wrote the rows.
+        """
+        label = model._meta.label
+        for owner_id, delta in deltas.items():
+            if not delta:
+                continue
+            counter = self.filter(owner_id=owner_id, model=label)
+            if counter.update(count=models.F('count') + delta) or delta < 0:
+                continue
+            # First row for this owner; ignore_conflicts covers a concurrent first insert
+            self.bulk_create([self.model(owner_id=owner_id, model=label, count=0)], ignore_conflicts=True)
+            counter.update(count=models.F('count') + delta)
+
+    def get_count(self, model, owner_id):
+        """
+        Number of `model` rows owned by owner_id, or None when there is no counter
+        """
+        return self.filter(owner_id=owner_id, model=model._meta.label).values_list('count', flat=True).first()
+
+    def total(self, model):
+        """
+        Number of `model` rows on this database, or None when there are no counters
+        """
+        return self.filter(model=model._meta.label).aggregate(total=models.Sum('count'))['total']
@@ -0,0 +1,398 @@
+# backend/core/loadtest.py
+# Asyncio load generator replaying the SPA's session lifecycle against a running server:
+# register -> verify email -> login -> refresh_token -> /api/user/ -> ExampleModel CRUD -> logout.
+# Standard library only; see `manage.py loadtest`.
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from http.cookies import SimpleCookie
+from urllib.parse import urlsplit
+
+# Defaults for every scenario; `thresholds` turn a run into a regression gate
+DEFAULT_SCENARIO = {
+    'concurrency': 10,      # journeys in flight at most
+    'rate': 0,              # new journeys per second (Poisson arrivals); 0 starts one whenever a slot frees up
+    'journeys': None,       # stop after starting this many journeys...
+    'duration': 60,         # ...or after this many seconds, whichever comes first
+    'items': 3,             # ExampleModel rows created, read, updated and deleted per journey
+    'timeout': 30,          # seconds per request, and for the verification email to arrive
+    # Reuse one connection per journey. Off by default: gunicorn's sync workers close after every
+    # response, and runserver's unbuffered writes add ~40ms (Nagle + delayed ACK) to reused connections.
+    'keep_alive': False,
+    'thresholds': {},
+}
+
+SCENARIOS = {
+    # One journey at a time: checks the whole flow still works
+    'smoke': {
+        'concurrency': 1, 'journeys': 3, 'duration': None, 'items': 2,
+        'thresholds': {'max_error_rate': 0, 'max_failed_journeys': 0},
+    },
+    # Steady arrivals, roughly what a busy day looks like
+    'baseline': {
+        'concurrency': 20, 'rate': 2, 'duration': 120, 'items': 5,
+        'thresholds': {
+            'max_error_rate': 0.01,
+            # p95 in milliseconds per endpoint; '*' applies to endpoints not listed
+            'p95_ms': {'POST /api/auth/register/': 1500, 'POST /api/auth/login/': 1500, '*': 300},
+        },
+    },
+    # Everything at once: finds the saturation point
+    'spike': {
+        'concurrency': 100, 'rate': 0, 'journeys': 300, 'duration': None, 'items': 3,
+        'thresholds': {'max_error_rate': 0.05},
+    },
+}
+
+
+def get_scenario(name, overrides=None, scenarios=None):
+    scenarios = SCENARIOS if scenarios is None else scenarios
+    if name not in scenarios:
+        raise KeyError(f"Unknown scenario {name!r}, choose from {', '.join(sorted(scenarios))}")
+    scenario = {**DEFAULT_SCENARIO, **scenarios[name]}
+    scenario.update({key: value for key, value in (overrides or {}).items() if value is not None})
+    return scenario
+
+
+class JourneyError(Exception):
+    pass
+
+
+class Inbox:
+    """
+    Verification tokens by recipient, read from console email backend output
+    (the server's stdout, or a file it is redirected to)
+    """
+    TOKEN_RE = re.compile(r'/verify-email/([0-9a-fA-F-]{36})')
+
+    def __init__(self):
+        self.tokens = {}
+        self._recipient = None
+        self._changed = asyncio.Event()
+
+    def feed_line(self, line):
+        if line.startswith('To: '):
+            self._recipient = line[4:].strip()
+            return
+        match = self.TOKEN_RE.search(line)
+        if match and self._recipient:
+            self.deliver(self._recipient, match.group(1))
+
+    def deliver(self, email, token):
+        self.tokens[email] = token
+        self._changed.set()
+
+    async def wait_for_token(self, email, timeout):
+        deadline = time.monotonic() + timeout
+        while email not in self.tokens:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise JourneyError('No verification email')
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+        return self.tokens.pop(email)
+
+    async def follow(self, reader):
+        """
+        Consume an asyncio.StreamReader, e.g. a server subprocess's stdout
+        """
+        while line := await reader.readline():
+            self.feed_line(line.decode(errors='replace').rstrip('\r\n'))
+
+    async def tail(self, path, poll_interval=0.05):
+        """
+        Follow a file the server's stdout is redirected to, starting at its current end
+        """
+        with open(path, encoding='utf-8', errors='replace') as f:
+            f.seek(0, 2)
+            while True:
+                line = f.readline()
+                if line:
+                    self.feed_line(line.rstrip('\r\n'))
+                else:
+                    await asyncio.sleep(poll_interval)
+
+
+class HTTPClient:
+    """
+    Minimal HTTP/1.1 client with one cookie jar, like a browser tab
+    """
+    def __init__(self, base_url, timeout=30, keep_alive=False):
+        url = urlsplit(base_url)
+        self.host = url.hostname
+        self.port = url.port or 80
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.cookies = {}
+        self._reader = None
+        self._writer = None
+
+    async def request(self, method, path, body=None, headers=None):
+        payload = json.dumps(body).encode() if body is not None else b''
+        lines = [
+            f'{method} {path} HTTP/1.1',
+            f'Host: {self.host}:{self.port}',
+            'Accept: application/json',
+            f'Content-Length: {len(payload)}',
+            'Connection: ' + ('keep-alive' if self.keep_alive else 'close'),
+        ]
+        if body is not None:
+            lines.append('Content-Type: application/json')
+        if self.cookies:
+            lines.append('Cookie: ' + '; '.join(f'{name}={value}' for name, value in self.cookies.items()))
+        lines.extend(f'{name}: {value}' for name, value in (headers or {}).items())
+        data = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + payload
+
+        reused = self._writer is not None
+        try:
+            return await asyncio.wait_for(self._send(data), self.timeout)
+        except asyncio.TimeoutError:
+            # A half-read response leaves the connection unusable
+            self.close()
+            raise
+        except (ConnectionError, asyncio.IncompleteReadError):
+            self.close()
+            if not reused:
+                raise
+        # The server closed the idle keep-alive connection; retry once on a new one
+        return await asyncio.wait_for(self._send(data), self.timeout)
+
+    async def _send(self, data):
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        self._writer.write(data)
+        await self._writer.drain()
+        return await self._read_response()
+
+    async def _read_response(self):
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionError('Connection closed by server')
+        version, status = status_line.decode('latin-1').split(' ', 2)[:2]
+
+        headers = {}
+        while (line := await self._reader.readline()) not in (b'\r\n', b'\n', b''):
+            name, _, value = line.decode('latin-1').partition(':')
+            name, value = name.strip().lower(), value.strip()
+            if name == 'set-cookie':
+                self._store_cookie(value)
+            headers[name] = value
+
+        if 'chunked' in headers.get('transfer-encoding', ''):
+            content = b''
+            while size := int((await self._reader.readline()).split(b';')[0], 16):
+                content += (await self._reader.readexactly(size + 2))[:-2]
+            await self._reader.readline()
+        elif 'content-length' in headers:
+            content = await self._reader.readexactly(int(headers['content-length']))
+        elif status in ('204', '304'):
+            content = b''
+        else:
+            content = await self._reader.read()
+            headers['connection'] = 'close'
+
+        if not self.keep_alive or headers.get('connection', '').lower() == 'close' or version == 'HTTP/1.0':
+            self.close()
+        return int(status), headers, content
+
+    def _store_cookie(self, header):
+        cookie = SimpleCookie()
+        cookie.load(header)
+        for name, morsel in cookie.items():
+            # delete_cookie() sends max-age=0
+            if morsel['max-age'] == '0':
+                self.cookies.pop(name, None)
+            else:
+                self.cookies[name] = morsel.value
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+
+class Stats:
+    """
+    Latencies and errors per endpoint ('METHOD /path/template/')
+    """
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.journeys = {'started': 0, 'completed': 0, 'failed': 0, 'delayed': 0}
+        self.failures = {}
+        self.started_at = time.perf_counter()
+        self.finished_at = None
+
+    def record(self, endpoint, elapsed, ok):
+        self.latencies.setdefault(endpoint, []).append(elapsed)
+        self.errors.setdefault(endpoint, 0)
+        if not ok:
+            self.errors[endpoint] += 1
+
+    def record_failure(self, reason):
+        self.failures[reason] = self.failures.get(reason, 0) + 1
+
+    def report(self):
+        elapsed = (self.finished_at or time.perf_counter()) - self.started_at
+        endpoints = {}
+        for endpoint, latencies in self.latencies.items():
+            latencies = sorted(latencies)
+            endpoints[endpoint] = {
+                'requests': len(latencies),
+                'errors': self.errors[endpoint],
+                'error_rate': self.errors[endpoint] / len(latencies),
+                'throughput': len(latencies) / elapsed,
+                **{f'p{p}_ms': percentile(latencies, p) * 1000 for p in (50, 90, 95, 99)},
+                'max_ms': latencies[-1] * 1000,
+            }
+        requests = sum(len(latencies) for latencies in self.latencies.values())
+        errors = sum(self.errors.values())
+        return {
+            'elapsed': elapsed,
+            'requests': requests,
+            'errors': errors,
+            'error_rate': errors / requests if requests else 0.0,
+            'throughput': requests / elapsed if elapsed else 0.0,
+            'journeys': dict(self.journeys),
+            'failures': dict(self.failures),
+            'endpoints': endpoints,
+        }
+
+
+def percentile(sorted_values, p):
+    """
+    Nearest-rank percentile
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def check_thresholds(report, thresholds):
+    """
+    Threshold violations as human-readable strings; an empty list means the gate passed
+    """
+    failures = []
+    max_error_rate = thresholds.get('max_error_rate')
+    if max_error_rate is not None and report['error_rate'] > max_error_rate:
+        failures.append(f"error rate {report['error_rate']:.2%} > {max_error_rate:.2%}")
+    max_failed_journeys = thresholds.get('max_failed_journeys')
+    if max_failed_journeys is not None and report['journeys']['failed'] > max_failed_journeys:
+        failures.append(f"{report['journeys']['failed']} failed journeys > {max_failed_journeys}")
+
+    p95 = thresholds.get('p95_ms', {})
+    for endpoint, stats in report['endpoints'].items():
+        limit = p95.get(endpoint, p95.get('*'))
+        if limit is not None and stats['p95_ms'] > limit:
+            failures.append(f"{endpoint} p95 {stats['p95_ms']:.1f}ms > {limit}ms")
+    return failures
+
+
+class Journey:
+    """
+    One virtual user going through the SPA's session lifecycle
+    """
+    def __init__(self, base_url, inbox, stats, scenario, csrf_cookie_name='csrftoken', csrf_header_name='X-CSRFToken'):
+        self.client = HTTPClient(base_url, timeout=scenario['timeout'], keep_alive=scenario['keep_alive'])
+        self.inbox = inbox
+        self.stats = stats
+        self.scenario = scenario
+        self.csrf_cookie_name = csrf_cookie_name
+        self.csrf_header_name = csrf_header_name
+
+    async def call(self, method, path, endpoint=None, body=None, expect=200):
+        headers = {}
+        # Like the SPA's axios config: echo the CSRF cookie on unsafe requests
+        if method not in ('GET', 'HEAD') and self.csrf_cookie_name in self.client.cookies:
+            headers[self.csrf_header_name] = self.client.cookies[self.csrf_cookie_name]
+
+        endpoint = f'{method} {endpoint or path}'
+        start = time.perf_counter()
+        try:
+            status, _, content = await self.client.request(method, path, body, headers)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as exc:
+            self.stats.record(endpoint, time.perf_counter() - start, ok=False)
+            raise JourneyError(f'{endpoint}: {type(exc).__name__}') from exc
+        self.stats.record(endpoint, time.perf_counter() - start, ok=status == expect)
+
+        if status != expect:
+            raise JourneyError(f'{endpoint}: HTTP {status}')
+        return json.loads(content) if content else None
+
+    async def run(self):
+        email = f'load-{uuid.uuid4().hex}@example.com'
+        password = uuid.uuid4().hex
+        try:
+            await self.call('POST', '/api/auth/register/', body={
+                'email': email, 'password': password, 'confirm_password': password,
+            }, expect=201)
+            token = await self.inbox.wait_for_token(email, self.scenario['timeout'])
+            await self.call('POST', f'/api/verify-email/{token}/', '/api/verify-email/{token}/')
+            await self.call('POST', '/api/auth/login/', body={'email': email, 'password': password})
+            await self.call('POST', '/api/auth/refresh_token/')
+            await self.call('GET', '/api/user/')
+
+            ids = []
+            for i in range(self.scenario['items']):
+                obj = await self.call('POST', '/api/examples/', body={
+                    'name': f'item {i}', 'description': 'load test ' * 20,
+                }, expect=201)
+                ids.append(obj['id'])
+            await self.call('GET', '/api/examples/')
+            for pk in ids:
+                detail = f'/api/examples/{pk}/'
+                await self.call('GET', detail, '/api/examples/{id}/')
+                await self.call('PATCH', detail, '/api/examples/{id}/', body={'name': f'renamed {pk}'})
+                await self.call('DELETE', detail, '/api/examples/{id}/', expect=204)
+
+            await self.call('POST', '/api/auth/logout/')
+        finally:
+            self.client.close()
+
+
+async def run_scenario(base_url, scenario, inbox, stats=None, **journey_options):
+    """
+    Start journeys at scenario['rate'] per second (or back to back when 0), at most
+    scenario['concurrency'] at a time, until `journeys` have started or `duration` has passed.
+    Arrivals that find every slot busy wait for one and are counted as delayed.
+    """
+    stats = stats or Stats()
+    slots = asyncio.Semaphore(scenario['concurrency'])
+    tasks = set()
+    deadline = time.monotonic() + scenario['duration'] if scenario['duration'] else None
+
+    async def journey():
+        try:
+            await Journey(base_url, inbox, stats, scenario, **journey_options).run()
+            stats.journeys['completed'] += 1
+        except Exception as exc:
+            # A failed step ends the journey, the others go on
+            stats.journeys['failed'] += 1
+            stats.record_failure(str(exc) if isinstance(exc, JourneyError) else f'{type(exc).__name__}: {exc}')
+        finally:
+            slots.release()
+
+    while scenario['journeys'] is None or stats.journeys['started'] < scenario['journeys']:
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        if slots.locked():
+            stats.journeys['delayed'] += 1
+        await slots.acquire()
+        stats.journeys['started'] += 1
+        task = asyncio.create_task(journey())
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        if scenario['rate']:
+            await asyncio.sleep(random.expovariate(scenario['rate']))
+
+    if tasks:
+        await asyncio.gather(*tasks)
+    stats.finished_at = time.perf_counter()
+    return stats
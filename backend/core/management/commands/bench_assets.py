@@ -0,0 +1,107 @@
+# backend/core/management/commands/bench_assets.py
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+import django
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse, HttpResponseNotFound
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+from django.views.static import serve
+from core.compression import brotli, compress_file
+from core.middleware import AssetMiddleware, CompressionMiddleware
+from core.models import ExampleModel
+from core.renderers import ORJSONRenderer
+from core.serializers import ExampleModelSerializer
+
+# Real-world files shipped with Django, so compression ratios are representative
+DEFAULT_FILES = [
+    'admin/js/vendor/jquery/jquery.js',
+    'admin/js/vendor/jquery/jquery.min.js',
+    'admin/css/base.css',
+    'admin/js/actions.js',
+]
+ACCEPT_ENCODING = 'gzip, deflate, br'
+
+
+class Command(BaseCommand):
+    help = (
+        'Time to first byte and bytes per response: django.views.static.serve vs AssetMiddleware '
+        'for static files, and API JSON with and without CompressionMiddleware'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--files', nargs='+', default=DEFAULT_FILES, help='Paths under django/contrib/admin/static')
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--api-rows', type=int, nargs='+', default=[10, 100])
+
+    def handle(self, *args, **options):
+        if brotli is None:
+            self.stdout.write(self.style.WARNING('brotli is not installed, only gzip variants are used'))
+
+        factory = RequestFactory()
+        source = os.path.join(os.path.dirname(django.__file__), 'contrib', 'admin', 'static')
+
+        with tempfile.TemporaryDirectory() as root:
+            for name in options['files']:
+                os.makedirs(os.path.dirname(os.path.join(root, name)), exist_ok=True)
+                shutil.copy(os.path.join(source, name), os.path.join(root, name))
+                compress_file(os.path.join(root, name))
+
+            # Every file counts as content-hashed here, as collectstatic output would be
+            assets = AssetMiddleware(lambda request: HttpResponseNotFound(), mounts=[('/', root, lambda name: True)])
+
+            self.stdout.write('static files (before: django.views.static.serve, after: AssetMiddleware)')
+            for name in options['files']:
+                before = self.measure(lambda: serve(factory.get('/' + name), name, document_root=root), options['requests'])
+                after = self.measure(
+                    lambda: assets(factory.get('/' + name, HTTP_ACCEPT_ENCODING=ACCEPT_ENCODING)), options['requests']
+                )
+                self.report(name, before, after)
+
+        self.stdout.write('API JSON (before: identity, after: CompressionMiddleware)')
+        now = timezone.now()
+        fields = [attname for _, attname, _ in ExampleModelSerializer.get_values_lookups()]
+        with override_settings(RESPONSE_COMPRESSION={'MIN_SIZE': 1024}):
+            for count in options['api_rows']:
+                rows = [
+                    {name: getattr(obj, name) for name in fields}
+                    for obj in (
+                        ExampleModel(
+                            id=i, owner_id=1, name=f'Example {i}', description=f'Lorem ipsum dolor sit amet {i}. ' * 8,
+                            created_at=now - timedelta(minutes=i), updated_at=now,
+                        )
+                        for i in range(count)
+                    )
+                ]
+                body = ORJSONRenderer().render(ExampleModelSerializer.to_values_representation(rows))
+                view = lambda request: HttpResponse(body, content_type='application/json')
+                request = factory.get('/api/examples/', HTTP_ACCEPT_ENCODING=ACCEPT_ENCODING)
+
+                before = self.measure(lambda: view(request), options['requests'])
+                after = self.measure(lambda: CompressionMiddleware(view)(request), options['requests'])
+                self.report(f'{count} rows', before, after)
+
+    def measure(self, handler, count):
+        """
+        Mean seconds until the first body chunk is available, and the body size
+        """
+        elapsed = 0.0
+        size = 0
+        for _ in range(count):
+            start = time.perf_counter()
+            response = handler()
+            chunks = iter(response.streaming_content) if response.streaming else iter([response.content])
+            first = next(chunks, b'')
+            elapsed += time.perf_counter() - start
+            size = len(first) + sum(len(chunk) for chunk in chunks)
+            response.close()
+        return elapsed / count, size
+
+    def report(self, label, before, after):
+        self.stdout.write(
+            f'  {label:<40} before={before[1]:>8}B {before[0] * 1000:7.3f}ms  '
+            f'after={after[1]:>8}B {after[0] * 1000:7.3f}ms  bytes={before[1] / after[1]:5.1f}x smaller'
+        )
@@ -0,0 +1,70 @@
+# backend/core/management/commands/bench_list_payload.py
+import time
+from contextlib import ExitStack
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.models import ExampleModel
+from core.serializers import ExampleModelSerializer
+from core.sharding import shard_for_owner
+from users.models import CustomUser
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare bytes and latency per /api/examples/ page: summary list vs full rows with description'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--description-size', type=int, nargs='+', default=[1024, 16384, 131072])
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+        url = reverse('example-list')
+        full_fields = ','.join(ExampleModelSerializer.Meta.fields)
+
+        # Rows are written to the configured database(s) and rolled back afterwards
+        try:
+            with ExitStack() as stack:
+                stack.enter_context(transaction.atomic())
+                user = CustomUser.objects.create_user(
+                    username='bench-list-payload', email='bench-list-payload@example.com', password=None
+                )
+                stack.enter_context(transaction.atomic(using=shard_for_owner(user.pk)))
+
+                client = APIClient()
+                client.force_authenticate(user)
+
+                for size in options['description_size']:
+                    ExampleModel.objects.for_owner(user.pk).delete()
+                    ExampleModel.objects.bulk_create([
+                        ExampleModel(owner=user, name=f'Example {i}', description='x' * size)
+                        for i in range(page_size)
+                    ])
+
+                    summary = self.measure(client, url, {}, options['repeat'])
+                    full = self.measure(client, url, {'fields': full_fields}, options['repeat'])
+
+                    self.stdout.write(
+                        f'description={size:<7} '
+                        f'summary={summary[0]:>9}B {summary[1] * 1000:8.3f}ms  '
+                        f'full={full[0]:>9}B {full[1] * 1000:8.3f}ms  '
+                        f'bytes={full[0] / summary[0]:6.1f}x latency={full[1] / summary[1]:5.1f}x'
+                    )
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def measure(self, client, url, params, repeat):
+        response = client.get(url, params, HTTP_HOST='localhost')
+        assert response.status_code == 200, response.status_code
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            client.get(url, params, HTTP_HOST='localhost')
+        return len(response.content), (time.perf_counter() - start) / repeat
@@ -0,0 +1,82 @@
+# backend/core/management/commands/bench_middleware.py
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.utils.module_loading import import_string
+
+FULL_MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+API_MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'core.middleware.NonAPIMiddlewareStack',
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+
+def view(request):
+    return HttpResponse(b'{}', content_type='application/json')
+
+
+class Command(BaseCommand):
+    help = "Per-request middleware overhead of the 'full' and 'api' deployment profiles"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20000)
+        parser.add_argument('--rounds', type=int, default=5)
+        parser.add_argument('--path', default=settings.API_PATH_PREFIX + 'examples/')
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        # A session cookie makes SessionMiddleware/AuthenticationMiddleware do their usual work
+        factory.cookies['sessionid'] = 'x' * 32
+
+        profiles = (('full', FULL_MIDDLEWARE), ('api', API_MIDDLEWARE), ('none', []))
+        handlers = {name: self.build_chain(middleware) for name, middleware in profiles}
+
+        # Interleave rounds and keep the best one so both profiles see the same machine noise
+        results = {name: float('inf') for name in handlers}
+        for _ in range(options['rounds']):
+            for name, handler in handlers.items():
+                elapsed = self.measure(handler, factory, options['path'], options['requests'])
+                results[name] = min(results[name], elapsed)
+
+        for name, elapsed in results.items():
+            self.stdout.write(f'{name:<5} {elapsed * 1e6:8.2f}us/request')
+
+        self.stdout.write(
+            f"api profile saves {(results['full'] - results['api']) * 1e6:.2f}us/request "
+            f"({(results['full'] - results['api']) / (results['full'] - results['none']) * 100:.0f}% "
+            f"of the full stack's overhead)"
+        )
+
+    def build_chain(self, middleware):
+        handler = view
+        for path in reversed(middleware):
+            handler = import_string(path)(handler)
+        return handler
+
+    def measure(self, handler, factory, path, count):
+        # No view touches request.user or request.session, so this is middleware cost only
+        requests = [
+            factory.get(path, SERVER_NAME='localhost', HTTP_ORIGIN='http://localhost:5173')
+            for _ in range(count)
+        ]
+        handler(requests[0])
+        start = time.perf_counter()
+        for request in requests:
+            handler(request)
+        return (time.perf_counter() - start) / count
@@ -0,0 +1,54 @@
+# backend/core/management/commands/bench_serialization.py
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from core.models import ExampleModel
+from core.renderers import ORJSONRenderer, orjson
+from core.serializers import ExampleModelSerializer
+
+
+class Command(BaseCommand):
+    help = 'Compare ExampleModel list serialization: ModelSerializer + JSONRenderer vs .values() rows + ORJSONRenderer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000])
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed, ORJSONRenderer uses the stdlib fallback'))
+
+        # Built in memory so the benchmark measures serialization only, not the database
+        now = timezone.now()
+        fields = [attname for _, attname, _ in ExampleModelSerializer.get_values_lookups()]
+
+        for size in options['sizes']:
+            instances = [
+                ExampleModel(
+                    id=i, owner_id=1, name=f'Example {i}', description='Lorem ipsum dolor sit amet. ' * 8,
+                    created_at=now - timedelta(minutes=i), updated_at=now,
+                )
+                for i in range(size)
+            ]
+            rows = [{name: getattr(obj, name) for name in fields} for obj in instances]
+
+            default = self.measure(options['repeat'], lambda: JSONRenderer().render(
+                ExampleModelSerializer(instances, many=True).data
+            ))
+            lean = self.measure(options['repeat'], lambda: ORJSONRenderer().render(
+                ExampleModelSerializer.to_values_representation(rows)
+            ))
+
+            self.stdout.write(
+                f'page_size={size:<5} default={default * 1000:8.3f}ms '
+                f'lean={lean * 1000:8.3f}ms speedup={default / lean:5.1f}x'
+            )
+
+    def measure(self, repeat, func):
+        func()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - start) / repeat
@@ -0,0 +1,100 @@
+# backend/core/management/commands/bench_startup.py
+import json
+import os
+import subprocess
+import sys
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter so every measurement is a cold start
+WSGI_PROBE = '''
+import io, json, sys, time
+start = time.perf_counter()
+from wsgiref.util import setup_testing_defaults
+from config.wsgi import application
+# What gunicorn's post_worker_init does (config/gunicorn.conf.py)
+from django.apps import apps
+apps.get_app_config('core').warm_up_connections()
+loaded = time.perf_counter()
+
+def request(path):
+    environ = {'PATH_INFO': path, 'wsgi.input': io.BytesIO()}
+    setup_testing_defaults(environ)
+    status = []
+    body = b''.join(application(environ, lambda s, h, exc_info=None: status.append(s)))
+    return status[0].split()[0], len(body)
+
+first = request(sys.argv[1])
+first_done = time.perf_counter()
+request(sys.argv[1])
+second_done = time.perf_counter()
+print(json.dumps({'load': loaded - start, 'first': first_done - loaded, 'second': second_done - first_done, 'status': first[0]}))
+'''
+
+ASGI_PROBE = '''
+import asyncio, json, sys, time
+start = time.perf_counter()
+from config.asgi import application
+loaded = time.perf_counter()
+
+async def request(path):
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+        'headers': [(b'host', b'localhost')], 'server': ('localhost', 80), 'client': ('127.0.0.1', 0),
+    }
+    messages = []
+    body_sent = []
+    async def receive():
+        if body_sent:
+            # nothing else arrives until the client disconnects
+            await asyncio.Future()
+        body_sent.append(True)
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+    async def send(message):
+        messages.append(message)
+    await application(scope, receive, send)
+    return str(messages[0]['status'])
+
+async def main():
+    first = await request(sys.argv[1])
+    first_done = time.perf_counter()
+    await request(sys.argv[1])
+    second_done = time.perf_counter()
+    print(json.dumps({'load': loaded - start, 'first': first_done - loaded, 'second': second_done - first_done, 'status': first}))
+
+asyncio.run(main())
+'''
+
+
+class Command(BaseCommand):
+    help = 'Time-to-first-request for the WSGI and ASGI entry points, with and without startup warm-up'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/user/')
+        parser.add_argument('--runs', type=int, default=3)
+
+    def handle(self, *args, **options):
+        for name, probe in (('wsgi', WSGI_PROBE), ('asgi', ASGI_PROBE)):
+            for warmup in (False, True):
+                runs = [self.run_probe(probe, options['path'], warmup) for _ in range(options['runs'])]
+                best = min(runs, key=lambda run: run['total'])
+                self.stdout.write(
+                    f"{name} warmup={'on ' if warmup else 'off'} status={best['status']} "
+                    f"process={best['total'] * 1000:7.1f}ms load={best['load'] * 1000:7.1f}ms "
+                    f"first_request={best['first'] * 1000:7.1f}ms second_request={best['second'] * 1000:6.1f}ms"
+                )
+
+    def run_probe(self, probe, path, warmup):
+        env = dict(os.environ, DJANGO_WARMUP_ON_STARTUP='true' if warmup else 'false')
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-c', probe, path],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        total = time.perf_counter() - start
+        if result.returncode != 0:
+            raise CommandError(f'Startup probe failed:\n{result.stderr}')
+        # Warm-up logging (e.g. an unreachable database) goes to stderr; the result is the last stdout line
+        return dict(json.loads(result.stdout.strip().splitlines()[-1]), total=total)
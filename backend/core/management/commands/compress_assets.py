@@ -0,0 +1,34 @@
+# backend/core/management/commands/compress_assets.py
+import os
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.compression import brotli, compress_directory
+
+
+class Command(BaseCommand):
+    help = (
+        'Write .br/.gz variants for the built SPA (FRONTEND_DIST_DIR) so AssetMiddleware can serve them. '
+        'Run after `npm run build`; collectstatic does the same for STATIC_ROOT.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('directories', nargs='*', help='Directories to compress (default: FRONTEND_DIST_DIR)')
+        parser.add_argument('--force', action='store_true', help='Recompress files whose variants are up to date')
+
+    def handle(self, *args, **options):
+        directories = options['directories'] or [settings.FRONTEND_DIST_DIR]
+        if brotli is None:
+            self.stdout.write(self.style.WARNING('brotli is not installed, only gzip variants are written'))
+
+        for root in directories:
+            if not root or not os.path.isdir(root):
+                raise CommandError(f'{root!r} is not a directory; build the frontend first')
+            written = compress_directory(root, force=options['force'])
+            sizes = {}
+            for path in written:
+                source = os.path.splitext(path)[0]
+                sizes.setdefault(source, os.path.getsize(source))
+            self.stdout.write(self.style.SUCCESS(
+                f'{root}: {len(written)} variants for {len(sizes)} files '
+                f'({sum(sizes.values())} bytes uncompressed, {sum(map(os.path.getsize, written))} bytes written)'
+            ))
@@ -0,0 +1,142 @@
+# backend/core/management/commands/loadtest.py
+import asyncio
+import json
+import os
+import socket
+import sys
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.loadtest import SCENARIOS, Inbox, check_thresholds, get_scenario, run_scenario
+
+CONSOLE_EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+
+
+class Command(BaseCommand):
+    help = (
+        'Run SPA session journeys (register, verify email, login, refresh, CRUD, logout) against a server '
+        'and report throughput, latency percentiles and errors per endpoint. Exits non-zero when the '
+        "scenario's thresholds are exceeded, so scenarios double as regression gates."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenario', default='smoke', help=f"One of {', '.join(SCENARIOS)} or a name from --scenario-file")
+        parser.add_argument('--scenario-file', help='JSON object of named scenarios, same keys as core.loadtest.SCENARIOS')
+        parser.add_argument('--serve', action='store_true', help='Start `manage.py runserver` with the console email backend')
+        parser.add_argument('--port', type=int, default=0, help='Port for --serve (default: a free one)')
+        parser.add_argument('--url', help='Base URL of an already running server, e.g. http://127.0.0.1:8000')
+        parser.add_argument('--mail-log', help="With --url: file the server's stdout (console email backend) goes to")
+        parser.add_argument('--concurrency', type=int)
+        parser.add_argument('--rate', type=float, help='New journeys per second; 0 = closed loop')
+        parser.add_argument('--journeys', type=int)
+        parser.add_argument('--duration', type=float)
+        parser.add_argument('--items', type=int)
+        parser.add_argument('--keep-alive', action='store_true', default=None, help='Reuse connections within a journey')
+        parser.add_argument('--json', dest='json_path', help='Also write the report to this file')
+
+    def handle(self, *args, **options):
+        if bool(options['serve']) == bool(options['url']):
+            raise CommandError('Pass either --serve or --url')
+        if options['url'] and not options['mail_log']:
+            raise CommandError('--url needs --mail-log to read verification emails from the server output')
+
+        scenarios = SCENARIOS
+        if options['scenario_file']:
+            with open(options['scenario_file']) as f:
+                scenarios = {**SCENARIOS, **json.load(f)}
+        try:
+            scenario = get_scenario(options['scenario'], {
+                name: options[name] for name in ('concurrency', 'rate', 'journeys', 'duration', 'items', 'keep_alive')
+            }, scenarios)
+        except KeyError as exc:
+            raise CommandError(exc.args[0])
+
+        report = asyncio.run(self.run(scenario, options))
+        self.print_report(report)
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as f:
+                json.dump({'scenario': scenario, 'report': report}, f, indent=2)
+
+        failures = check_thresholds(report, scenario['thresholds'])
+        if failures:
+            raise CommandError('Thresholds exceeded:\n  ' + '\n  '.join(failures))
+        if scenario['thresholds']:
+            self.stdout.write(self.style.SUCCESS('All thresholds met'))
+
+    async def run(self, scenario, options):
+        inbox = Inbox()
+        csrf = {
+            'csrf_cookie_name': settings.CSRF_COOKIE_NAME,
+            'csrf_header_name': settings.JWT_AUTH['JWT_CSRF_HEADER_NAME'],
+        }
+
+        if options['url']:
+            follower = asyncio.create_task(inbox.tail(options['mail_log']))
+            try:
+                return (await run_scenario(options['url'], scenario, inbox, **csrf)).report()
+            finally:
+                follower.cancel()
+
+        port = options['port'] or self.free_port()
+        server = await self.start_server(port)
+        follower = asyncio.create_task(inbox.follow(server.stdout))
+        try:
+            await self.wait_until_listening(port, server)
+            return (await run_scenario(f'http://127.0.0.1:{port}', scenario, inbox, **csrf)).report()
+        finally:
+            follower.cancel()
+            server.terminate()
+            await server.wait()
+
+    async def start_server(self, port):
+        self.stdout.write(
+            'Starting runserver; for production-like numbers run gunicorn and use --url/--mail-log instead'
+        )
+        env = {
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings'),
+            'EMAIL_BACKEND': CONSOLE_EMAIL_BACKEND,
+            'PYTHONUNBUFFERED': '1',
+        }
+        return await asyncio.create_subprocess_exec(
+            sys.executable, os.path.join(settings.BASE_DIR, 'manage.py'),
+            'runserver', f'127.0.0.1:{port}', '--noreload', '--skip-checks',
+            env=env, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL,
+        )
+
+    async def wait_until_listening(self, port, server, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.returncode is not None:
+                raise CommandError(f'runserver exited with status {server.returncode}')
+            try:
+                _, writer = await asyncio.open_connection('127.0.0.1', port)
+                writer.close()
+                return
+            except OSError:
+                await asyncio.sleep(0.1)
+        raise CommandError(f'runserver did not start listening on port {port}')
+
+    def free_port(self):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            return sock.getsockname()[1]
+
+    def print_report(self, report):
+        journeys = report['journeys']
+        self.stdout.write(
+            f"{journeys['started']} journeys: {journeys['completed']} completed, {journeys['failed']} failed, "
+            f"{journeys['delayed']} delayed by the concurrency limit; {report['requests']} requests in "
+            f"{report['elapsed']:.1f}s ({report['throughput']:.1f} req/s, {report['error_rate']:.2%} errors)"
+        )
+        self.stdout.write(
+            f"{'endpoint':<36} {'reqs':>6} {'req/s':>7} {'err%':>6} {'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+        )
+        for endpoint, stats in report['endpoints'].items():
+            self.stdout.write(
+                f"{endpoint:<36} {stats['requests']:>6} {stats['throughput']:>7.1f} {stats['error_rate'] * 100:>6.1f} "
+                + ' '.join(f"{stats[key]:>6.1f}ms" for key in ('p50_ms', 'p90_ms', 'p95_ms', 'p99_ms', 'max_ms'))
+            )
+        for reason, count in sorted(report['failures'].items(), key=lambda item: -item[1]):
+            self.stdout.write(self.style.WARNING(f'{count:>6} x {reason}'))
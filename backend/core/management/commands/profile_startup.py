@@ -0,0 +1,42 @@
+# backend/core/management/commands/profile_startup.py
+from django.core.management.base import BaseCommand, CommandError
+from core.profiling import ProbeError, import_time_by_package, memory_by_package, run_probe
+
+
+class Command(BaseCommand):
+    help = 'Per-module import time and memory of config.wsgi.application and config.asgi.application'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entry-point', choices=['wsgi', 'asgi'], nargs='+', default=['wsgi', 'asgi'])
+        parser.add_argument('--top', type=int, default=15)
+
+    def handle(self, *args, **options):
+        top = options['top']
+        
+        for entry_point in options['entry_point']:
+            module = f'config.{entry_point}'
+            try:
+                # Separate runs: tracemalloc slows imports down and would skew the timings
+                timing = run_probe(module, importtime=True)
+                memory = run_probe(module, trace_memory=True)
+            except ProbeError as exc:
+                raise CommandError(f'Importing {module} failed:\n{exc}')
+                
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{module}.application'))
+            self.stdout.write(
+                f"  import: {timing['elapsed'] * 1000:.1f}ms  modules: {len(timing['modules'])}  "
+                f"max RSS: {timing['maxrss_kb'] / 1024:.1f}MB  "
+                f"traced: {sum(size for _, size in memory['memory']) / 1024 / 1024:.1f}MB"
+            )
+            
+            self.stdout.write('  slowest modules (self time):')
+            for name, self_us, cumulative_us, _ in sorted(timing['imports'], key=lambda row: row[1], reverse=True)[:top]:
+                self.stdout.write(f'    {self_us / 1000:8.1f}ms  (cumulative {cumulative_us / 1000:8.1f}ms)  {name}')
+                
+            self.stdout.write('  import time by package:')
+            for package, self_us in import_time_by_package(timing['imports'])[:top]:
+                self.stdout.write(f'    {self_us / 1000:8.1f}ms  {package}')
+                
+            self.stdout.write('  memory by package:')
+            for package, size in memory_by_package(memory['memory'])[:top]:
+                self.stdout.write(f'    {size / 1024:8.1f}KB  {package}')
@@ -0,0 +1,98 @@
+# backend/core/management/commands/rebalance_shards.py
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from core.sharding import is_counted_model, shard_for_owner
+
+
+class Command(BaseCommand):
+    help = (
+        'Move BaseModel rows whose owner hashes to a different shard under the current DB_SHARD_URLS. '
+        'Run after adding a shard or marking one as draining, or with --from default after enabling sharding. '
+        'Moved rows get new primary keys on the target shard.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would move')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--from', dest='source', metavar='DATABASE',
+            help='Scan only this database, e.g. `default` to move the rows written before DB_SHARD_URLS was set',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.SHARDS:
+            raise CommandError('Sharding is not enabled (DB_SHARD_URLS is empty)')
+        if options['source'] is not None and options['source'] not in settings.DATABASES:
+            raise CommandError(f"Unknown database {options['source']!r}")
+            
+        # Draining shards are scanned too, they are just no longer a target
+        sources = [options['source']] if options['source'] else settings.SHARD_DATABASES
+        
+        # Counters follow on their own: the copy and delete below adjust them on both shards
+        for model in apps.get_models():
+            if is_counted_model(model):
+                self.rebalance_model(model, sources, options['dry_run'], options['batch_size'])
+                
+    def rebalance_model(self, model, sources, dry_run, batch_size):
+        label = model._meta.label
+        moved = 0
+        
+        for shard in sources:
+            queryset = model.objects.using(shard)
+            owner_ids = queryset.order_by().values_list('owner_id', flat=True).distinct()
+            for owner_id in owner_ids.iterator():
+                target = shard_for_owner(owner_id)
+                if target == shard:
+                    continue
+                    
+                rows = queryset.filter(owner_id=owner_id)
+                if dry_run:
+                    count = rows.count()
+                    self.stdout.write(f'{label}: owner {owner_id} {shard} -> {target} ({count} rows)')
+                    moved += count
+                    continue
+                    
+                moved += self.move_owner(model, rows, shard, target, batch_size)
+                self.stdout.write(f'{label}: owner {owner_id} moved {shard} -> {target}')
+                
+        verb = 'would move' if dry_run else 'moved'
+        self.stdout.write(self.style.SUCCESS(f'{label}: {verb} {moved} rows'))
+        for shard in dict.fromkeys([*sources, *settings.SHARD_DATABASES]):
+            self.stdout.write(f'  {shard}: {model.objects.using(shard).count()} rows')
+            
+    def move_owner(self, model, rows, source, target, batch_size):
+        """
+        Copy and delete in batches, so an interrupted run leaves at most one batch duplicated
+        """
+        timestamp_fields = [
+            field.name for field in model._meta.concrete_fields
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+        ]
+        moved = 0
+        
+        while True:
+            batch = list(rows.order_by('pk')[:batch_size])
+            if not batch:
+                return moved
+                
+            source_pks = [obj.pk for obj in batch]
+            timestamps = [{name: getattr(obj, name) for name in timestamp_fields} for obj in batch]
+            for obj in batch:
+                obj.pk = None
+                obj._state.adding = True
+                
+            with transaction.atomic(using=target):
+                created = model.objects.using(target).bulk_create(batch)
+                # bulk_create applies auto_now/auto_now_add; bulk_update writes the originals back
+                if timestamp_fields:
+                    for obj, values in zip(created, timestamps):
+                        for name, value in values.items():
+                            setattr(obj, name, value)
+                    model.objects.using(target).bulk_update(created, timestamp_fields)
+                    
+            with transaction.atomic(using=source):
+                model.objects.using(source).filter(pk__in=source_pks).delete()
+                
+            moved += len(batch)
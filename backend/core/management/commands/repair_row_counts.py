@@ -0,0 +1,50 @@
+# backend/core/management/commands/repair_row_counts.py
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from core.models import OwnerRowCount
+from core.sharding import fan_out, is_counted_model
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute OwnerRowCount from the rows on every shard and fix counters that drifted, '
+        'e.g. after QuerySet.update(owner=...), raw SQL or a restore.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report mismatched counters')
+
+    def handle(self, *args, **options):
+        for model in apps.get_models():
+            if is_counted_model(model):
+                for shard, queryset in fan_out(model.objects.all()):
+                    self.repair(model, shard, queryset, options['dry_run'])
+
+    def repair(self, model, shard, queryset, dry_run):
+        label = model._meta.label
+
+        with transaction.atomic(using=shard):
+            # Locking the counters first makes concurrent writers wait for the repair instead
+            # of incrementing a counter that is about to be overwritten
+            counters = OwnerRowCount.objects.using(shard).filter(model=label)
+            stored = dict(counters.select_for_update().values_list('owner_id', 'count'))
+            actual = dict(
+                queryset.order_by().values('owner_id').annotate(rows=Count('pk')).values_list('owner_id', 'rows')
+            )
+
+            wrong = {
+                owner_id: actual.get(owner_id, 0)
+                for owner_id in stored.keys() | actual.keys()
+                if stored.get(owner_id) != actual.get(owner_id, 0)
+            }
+            for owner_id, count in sorted(wrong.items()):
+                self.stdout.write(f'{label} on {shard}: owner {owner_id} {stored.get(owner_id)} -> {count}')
+
+            if not dry_run:
+                for owner_id, count in wrong.items():
+                    counters.update_or_create(owner_id=owner_id, model=label, defaults={'count': count})
+
+        verb = 'would fix' if dry_run else 'fixed'
+        self.stdout.write(self.style.SUCCESS(f'{label} on {shard}: {verb} {len(wrong)} of {len(actual)} owners'))
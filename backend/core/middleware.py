@@ -0,0 +1,184 @@
+# backend/core/middleware.py
+import mimetypes
+import os
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.urls import Resolver404, resolve
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from django.utils.module_loading import import_string
+from .compression import COMPRESSIBLE_CONTENT_TYPES, ENCODINGS, choose_encoding, compress
+
+
+class NonAPIMiddlewareStack:
+    """
+    Runs settings.NON_API_MIDDLEWARE (sessions, auth, messages) only for paths outside API_PATH_PREFIX.
+    API views authenticate with JWT cookies and never use request.session or messages,
+    while the admin still gets the full stack.
+
+    The wrapped middleware must not define process_view/process_exception hooks,
+    since Django only collects those from top-level MIDDLEWARE entries.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = settings.API_PATH_PREFIX
+        
+        handler = get_response
+        for path in reversed(settings.NON_API_MIDDLEWARE):
+            handler = import_string(path)(handler)
+        self.non_api_handler = handler
+        
+    def __call__(self, request):
+        if request.path_info.startswith(self.prefix):
+            return self.get_response(request)
+        return self.non_api_handler(request)
+
+
+class StaticAsset:
+    """
+    A file served by AssetMiddleware, with its pre-compressed variants keyed by Content-Encoding
+    """
+    def __init__(self, path, immutable):
+        stat = os.stat(path)
+        self.path = path
+        self.immutable = immutable
+        self.content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        # size + mtime, like most web servers; the hashed names change with the content anyway
+        self.etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+        self.variants = {None: (path, stat.st_size)}
+        for encoding, suffix in ENCODINGS:
+            # A variant older than the file is left over from a previous build
+            if os.path.exists(path + suffix) and os.path.getmtime(path + suffix) >= stat.st_mtime:
+                self.variants[encoding] = (path + suffix, os.path.getsize(path + suffix))
+
+
+class AssetMiddleware:
+    """
+    Serves collectstatic output (STATIC_URL) and the built SPA (FRONTEND_DIST_DIR, at /) from disk
+    before the rest of the stack runs:
+    - the .br/.gz variant written at build time (collectstatic, `manage.py compress_assets` for the SPA)
+      is picked from Accept-Encoding, nothing is compressed per request;
+    - FileResponse lets the WSGI server use sendfile (wsgi.file_wrapper);
+    - content-hashed files are cached for a year as immutable, everything else is revalidated by ETag;
+    - paths that no URL pattern matches fall back to the SPA's index.html for client-side routes.
+
+    Files are indexed once at startup, so restart workers after collectstatic or a frontend build.
+    """
+    immutable_cache_control = 'public, max-age=31536000, immutable'
+    revalidate_cache_control = 'no-cache'
+
+    def __init__(self, get_response, mounts=None):
+        self.get_response = get_response
+        self.assets = {}
+        for prefix, root, is_immutable in (self.get_mounts() if mounts is None else mounts):
+            self.add_directory(prefix, root, is_immutable)
+        self.spa_index = self.assets.get('/index.html') if settings.FRONTEND_DIST_DIR else None
+
+    def get_mounts(self):
+        mounts = []
+        if settings.STATIC_ROOT:
+            hashed_names = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+            mounts.append((settings.STATIC_URL, settings.STATIC_ROOT, hashed_names.__contains__))
+        if settings.FRONTEND_DIST_DIR:
+            # Vite writes content-hashed files to assets/
+            mounts.append(('/', settings.FRONTEND_DIST_DIR, lambda name: name.startswith('assets/')))
+        return mounts
+
+    def add_directory(self, prefix, root, is_immutable):
+        suffixes = tuple(suffix for _, suffix in ENCODINGS)
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                if path.endswith(suffixes) and os.path.exists(os.path.splitext(path)[0]):
+                    continue
+                name = os.path.relpath(path, root).replace(os.sep, '/')
+                self.assets[prefix + name] = StaticAsset(path, is_immutable(name))
+                if name == 'index.html':
+                    self.assets[prefix] = self.assets[prefix + name]
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD'):
+            asset = self.assets.get(request.path_info)
+            if asset is None and self.spa_index is not None and self.is_client_route(request):
+                asset = self.spa_index
+            if asset is not None:
+                return self.serve(request, asset)
+        return self.get_response(request)
+
+    def is_client_route(self, request):
+        if 'text/html' not in request.headers.get('Accept', ''):
+            return False
+        try:
+            resolve(request.path_info, getattr(request, 'urlconf', None))
+        except Resolver404:
+            return True
+        return False
+
+    def serve(self, request, asset):
+        encoding = choose_encoding(request.headers.get('Accept-Encoding', ''), asset.variants)
+        path, size = asset.variants[encoding]
+        etag = asset.etag if encoding is None else f'{asset.etag[:-1]}-{encoding}"'
+
+        if_none_match = [tag.removeprefix('W/') for tag in parse_etags(request.headers.get('If-None-Match', ''))]
+        if etag in if_none_match or '*' in if_none_match:
+            response = HttpResponseNotModified()
+        elif request.method == 'HEAD':
+            response = HttpResponse(content_type=asset.content_type)
+            response['Content-Length'] = size
+        else:
+            response = FileResponse(open(path, 'rb'), content_type=asset.content_type)
+            del response['Content-Disposition']
+
+        response['ETag'] = etag
+        response['Cache-Control'] = self.immutable_cache_control if asset.immutable else self.revalidate_cache_control
+        if encoding is not None and response.status_code == 200:
+            response['Content-Encoding'] = encoding
+        if len(asset.variants) > 1:
+            patch_vary_headers(response, ['Accept-Encoding'])
+        return response
+
+
+class CompressionMiddleware:
+    """
+    Compresses API_PATH_PREFIX responses of at least RESPONSE_COMPRESSION['MIN_SIZE'] bytes with
+    brotli (when installed) or gzip. Levels are low on purpose: this runs on every response,
+    unlike the build-time compression of static assets.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = settings.API_PATH_PREFIX
+        config = settings.RESPONSE_COMPRESSION
+        self.min_size = config.get('MIN_SIZE', 1024)
+        self.levels = {'br': config.get('BROTLI_QUALITY', 4), 'gzip': config.get('GZIP_LEVEL', 6)}
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not request.path_info.startswith(self.prefix) or not self.is_compressible(response):
+            return response
+
+        patch_vary_headers(response, ['Accept-Encoding'])
+        encoding = choose_encoding(request.headers.get('Accept-Encoding', ''), self.levels)
+        if encoding is None:
+            return response
+
+        compressed = compress(response.content, encoding, self.levels[encoding])
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = len(compressed)
+        response['Content-Encoding'] = encoding
+        # The compressed bytes differ from what a strong ETag would promise
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
+
+    def is_compressible(self, response):
+        return (
+            not response.streaming
+            and not response.has_header('Content-Encoding')
+            and len(response.content) >= self.min_size
+            and response.get('Content-Type', '').startswith(COMPRESSIBLE_CONTENT_TYPES)
+        )
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.1 on 2026-10-19 13:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models, router
+
+
+def count_existing_rows(apps, schema_editor):
+    db = schema_editor.connection.alias
+    ExampleModel = apps.get_model('core', 'ExampleModel')
+    OwnerRowCount = apps.get_model('core', 'OwnerRowCount')
+    if not router.allow_migrate_model(db, ExampleModel):
+        return
+    counts = ExampleModel.objects.using(db).values('owner_id').annotate(rows=models.Count('pk')).order_by()
+    OwnerRowCount.objects.using(db).bulk_create([
+        OwnerRowCount(owner_id=row['owner_id'], model='core.ExampleModel', count=row['rows'])
+        for row in counts
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_alter_examplemodel_owner'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OwnerRowCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100)),
+                ('count', models.BigIntegerField(default=0)),
+                ('owner', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('owner', 'model'), name='core_ownerrowcount_owner_model')],
+            },
+        ),
+        migrations.RunPython(count_existing_rows, migrations.RunPython.noop),
+    ]
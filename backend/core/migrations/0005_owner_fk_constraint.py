@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:10
+
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Used to restore the owner foreign key constraint depending on DB_SHARD_URLS;
+    the owner never has a constraint now, and 0006 drops the ones it created
+    """
+
+    dependencies = [
+        ('core', '0004_ownerrowcount'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = []
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.1 on 2026-10-20 09:00
+
+from django.conf import settings
+from django.db import migrations, models, router
+
+
+def drop_owner_constraints(apps, schema_editor):
+    """
+    Drop the owner foreign keys an earlier 0005 created on unsharded databases,
+    so every database ends up with the same schema
+    """
+    db = schema_editor.connection.alias
+    for model_name in ('ExampleModel', 'OwnerRowCount'):
+        model = apps.get_model('core', model_name)
+        if not router.allow_migrate_model(db, model):
+            continue
+        field = model._meta.get_field('owner')
+        if not schema_editor._constraint_names(model, [field.column], foreign_key=True):
+            continue
+        name, path, args, kwargs = field.deconstruct()
+        kwargs.update(to=field.related_model, db_constraint=True)
+        constrained = models.ForeignKey(*args, **kwargs)
+        constrained.set_attributes_from_name(name)
+        constrained.model = model
+        schema_editor.alter_field(model, constrained, field)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_owner_fk_constraint'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_owner_constraints, migrations.RunPython.noop),
+    ]
@@ -1,14 +1,74 @@
 # backend/core/models.py
-from django.db import models
+from django.db import models, router, transaction
 from users.models import CustomUser
+from .counters import RowCountQuerySet
+from .sharding import ShardedQuerySet
 
 class BaseModel(models.Model):
-    owner = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
+    # With sharding enabled rows live on a shard while users stay on `default`
+    # (see core.routers.OwnerShardRouter), so there is no database constraint or ORM cascade,
+    # with or without shards; core.signals.delete_owned_rows deletes the rows with their owner instead.
+    owner = models.ForeignKey(CustomUser, on_delete=models.DO_NOTHING, db_constraint=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ShardedQuerySet.as_manager()
+    
     class Meta:
         abstract = True
+        
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets save() move the row between owner counters when the owner changes
+        instance._loaded_owner_id = instance.__dict__.get('owner_id')
+        return instance
+        
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        adding = self._state.adding
+        previous_owner_id = getattr(self, '_loaded_owner_id', None)
+        
+        # The row and its owner's counter are written in one transaction
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+            if adding:
+                OwnerRowCount.objects.using(using).adjust(type(self), {self.owner_id: 1})
+            elif previous_owner_id is not None and previous_owner_id != self.owner_id:
+                OwnerRowCount.objects.using(using).adjust(type(self), {previous_owner_id: -1, self.owner_id: 1})
+                
+        self._loaded_owner_id = self.owner_id
+        
+    def delete(self, using=None, keep_parents=False):
+        using = using or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            deleted, per_model = super().delete(using=using, keep_parents=keep_parents)
+            OwnerRowCount.objects.using(using).adjust(
+                type(self), {self.owner_id: -per_model.get(self._meta.label, 0)}
+            )
+        return deleted, per_model
+
+
+class OwnerRowCount(models.Model):
+    """
+    Materialized number of rows per owner and BaseModel subclass, used by pagination
+    instead of COUNT(*). Stored on the owner's shard next to the rows; kept in sync by
+    BaseModel.save()/delete() and ShardedQuerySet.bulk_create()/delete(). QuerySet.update()
+    and raw SQL bypass it: run `manage.py repair_row_counts` after those.
+    """
+    owner = models.ForeignKey(CustomUser, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    model = models.CharField(max_length=100)
+    count = models.BigIntegerField(default=0)
+    
+    objects = RowCountQuerySet.as_manager()
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'model'], name='core_ownerrowcount_owner_model'),
+        ]
+        
+    def __str__(self):
+        return f'{self.model} owner={self.owner_id}: {self.count}'
 
 
 class ExampleModel(BaseModel):
@@ -16,4 +76,4 @@ class ExampleModel(BaseModel):
     description = models.TextField()
     
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
@@ -0,0 +1,100 @@
+# backend/core/pagination.py
+import json
+from functools import partial
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from rest_framework.pagination import PageNumberPagination
+
+
+def estimated_count(queryset):
+    """
+    Planner row estimate for the queryset (PostgreSQL only), None on other databases
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class CountedPage(Page):
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+class CountedPaginator(Paginator):
+    """
+    Paginator that takes an approximate total from the caller instead of running COUNT(*).
+    Pages fetch one row more than they show to know whether another page follows, so
+    a stale or estimated total never 404s a page that has rows or links to an empty one;
+    the total is corrected from what the page saw (exact on the last page).
+    """
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count = count
+
+    def validate_number(self, number):
+        # Only the lower bound: the total is approximate, page() checks for rows instead
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages['invalid_page'])
+        if number < 1:
+            raise EmptyPage(self.error_messages['min_page'])
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages['no_results'])
+            
+        if has_next:
+            self.count = max(self.count, bottom + len(rows) + 1)
+        else:
+            self.count = bottom + len(rows)
+        return CountedPage(rows, number, self, has_next)
+
+
+class CountedPageNumberPagination(PageNumberPagination):
+    """
+    PageNumberPagination that avoids COUNT(*) where it can: the total comes from
+    view.get_pagination_count(queryset) when the view defines it, then, for views that set
+    estimate_pagination_count = True, from the PostgreSQL planner estimate once that exceeds
+    estimate_threshold rows, and only then from COUNT(*). Totals other than COUNT(*) are
+    treated as approximate, see CountedPaginator.
+    """
+    estimate_threshold = 100_000
+
+    def get_count(self, queryset, view=None):
+        if view is not None and hasattr(view, 'get_pagination_count'):
+            count = view.get_pagination_count(queryset)
+            if count is not None:
+                return max(count, 0)
+
+        if not getattr(view, 'estimate_pagination_count', False):
+            return None
+        estimate = estimated_count(queryset)
+        if estimate is not None and estimate >= self.estimate_threshold:
+            return estimate
+        return None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.django_paginator_class = Paginator
+        if self.get_page_size(request):
+            count = self.get_count(queryset, view)
+            if count is not None:
+                self.django_paginator_class = partial(CountedPaginator, count=count)
+        return super().paginate_queryset(queryset, request, view)
@@ -0,0 +1,20 @@
+# backend/core/parsers.py
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from .renderers import ORJSONRenderer, orjson
+
+
+class ORJSONParser(JSONParser):
+    """
+    JSONParser backed by orjson. Request bodies must be UTF-8 encoded.
+    """
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,102 @@
+# backend/core/profiling.py
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from django.conf import settings
+
+# Imports `module` in a fresh interpreter and reports what it cost
+PROBE = '''
+import importlib, json, resource, sys, time, tracemalloc
+trace_memory = sys.argv[2] == '1'
+if trace_memory:
+    tracemalloc.start(25)
+start = time.perf_counter()
+importlib.import_module(sys.argv[1]).application
+result = {
+    'elapsed': time.perf_counter() - start,
+    'maxrss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'modules': sorted(sys.modules),
+}
+if trace_memory:
+    # Charge each allocation to the innermost frame outside importlib, so code objects
+    # unmarshalled for a module count towards the module whose import statement loaded it
+    sizes = {}
+    for trace in tracemalloc.take_snapshot().traces:
+        filename = next(
+            (frame.filename for frame in reversed(trace.traceback) if not frame.filename.startswith('<frozen')),
+            '<frozen>',
+        )
+        sizes[filename] = sizes.get(filename, 0) + trace.size
+    result['memory'] = sorted(sizes.items())
+print(json.dumps(result))
+'''
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+class ProbeError(Exception):
+    pass
+
+
+def run_probe(module, trace_memory=False, importtime=False, env=None):
+    """
+    Import `module` (e.g. 'config.wsgi') in a subprocess started from BASE_DIR.
+    Returns the probe result; with importtime=True, 'imports' holds
+    (module, self_us, cumulative_us, depth) rows parsed from `python -X importtime`.
+    """
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', PROBE, module, '1' if trace_memory else '0']
+    
+    result = subprocess.run(
+        command, cwd=settings.BASE_DIR, env=dict(os.environ, **(env or {})),
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise ProbeError(result.stderr)
+        
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    if importtime:
+        data['imports'] = []
+        for line in result.stderr.splitlines():
+            match = IMPORTTIME_LINE.match(line)
+            if match:
+                self_us, cumulative_us, indent, name = match.groups()
+                data['imports'].append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return data
+
+
+def package_for_path(path):
+    """
+    Top-level package a source file belongs to: an installed distribution, a project app or the stdlib
+    """
+    path = os.path.abspath(path)
+    base_dir = os.path.abspath(settings.BASE_DIR)
+    for marker in ('site-packages', 'dist-packages'):
+        if f'{os.sep}{marker}{os.sep}' in path:
+            relative = path.split(f'{os.sep}{marker}{os.sep}', 1)[1]
+            return relative.split(os.sep, 1)[0].removesuffix('.py')
+    if path.startswith(base_dir + os.sep):
+        return os.path.relpath(path, base_dir).split(os.sep, 1)[0].removesuffix('.py')
+    return '<stdlib>'
+
+
+def import_time_by_package(imports):
+    """
+    Sum `self` import time per top-level package; the totals add up to the whole import
+    """
+    totals = defaultdict(int)
+    for name, self_us, _, _ in imports:
+        totals[name.split('.', 1)[0]] += self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def memory_by_package(memory):
+    totals = defaultdict(int)
+    for filename, size in memory:
+        totals[package_for_path(filename)] += size
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
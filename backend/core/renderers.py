@@ -0,0 +1,50 @@
+# backend/core/renderers.py
+from decimal import Decimal
+from django.utils.functional import Promise
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # optional dependency, fall back to the stdlib encoder
+    orjson = None
+
+
+def _default(obj):
+    """
+    Types orjson does not handle natively, encoded the same way DRF's JSONEncoder would
+    """
+    # COERCE_DECIMAL_TO_STRING only applies to serializers.DecimalField, which returns strings;
+    # a bare Decimal in response data is a number, as with JSONEncoder
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, Promise):
+        return str(obj)
+    return JSONEncoder().default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer backed by orjson, which encodes datetimes, dates, UUIDs and
+    dict/list subclasses (ReturnDict, ReturnList) without a Python-level encoder.
+    """
+    options = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        options = self.options
+        if self.get_indent(accepted_media_type, renderer_context) is not None:
+            options |= orjson.OPT_INDENT_2
+
+        ret = orjson.dumps(data, default=_default, option=options)
+
+        # Keep the output a strict javascript subset, as JSONRenderer does
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
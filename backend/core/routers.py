@@ -0,0 +1,62 @@
+# backend/core/routers.py
+import logging
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from .sharding import is_sharded_model, shard_for_owner
+
+logger = logging.getLogger(__name__)
+
+
+class OwnerShardRouter:
+    """
+    Routes BaseModel-derived models to the shard owning their `owner_id`;
+    everything else (users, auth, sessions, admin) stays on `default`.
+
+    Routers never see query filters, so queries without an instance hint go to the
+    first shard and only see its rows; they are logged as warnings. Use
+    ShardedQuerySet.for_owner(), .using(shard) or core.sharding.fan_out() instead.
+    """
+    def _shard_for_hints(self, model, hints):
+        instance = hints.get('instance')
+        if instance is not None and is_sharded_model(type(instance)) and instance.owner_id is not None:
+            return shard_for_owner(instance.owner_id)
+        # Related managers, e.g. user.examplemodel_set, pass the owner itself
+        if isinstance(instance, get_user_model()) and instance.pk is not None:
+            return shard_for_owner(instance.pk)
+        if instance is not None and instance._state.db in settings.SHARD_DATABASES:
+            return instance._state.db
+        logger.warning(
+            '%s queried without an owner or .using(); only %s is searched. '
+            'Use for_owner(), .using(shard) or fan_out().',
+            model._meta.label, settings.SHARDS[0],
+        )
+        return settings.SHARDS[0]
+
+    def db_for_read(self, model, **hints):
+        if is_sharded_model(model):
+            return self._shard_for_hints(model, hints)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        if is_sharded_model(model):
+            return self._shard_for_hints(model, hints)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Sharded rows point at users on `default` through owner_id (no FK constraint)
+        if is_sharded_model(type(obj1)) or is_sharded_model(type(obj2)):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if model_name is None:
+            return None
+        try:
+            # The live model, not the historical one in hints, so BaseModel subclasses are recognised
+            model = apps.get_model(app_label, model_name)
+        except LookupError:
+            return None
+        if is_sharded_model(model):
+            return db in settings.SHARD_DATABASES
+        return db == 'default'
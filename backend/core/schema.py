@@ -0,0 +1,53 @@
+# backend/core/schema.py
+import hashlib
+import os
+import threading
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import condition, require_GET
+
+_schema = None
+_schema_lock = threading.Lock()
+
+
+def generate_schema():
+    """
+    Run drf_spectacular's introspection and return the schema as JSON bytes,
+    the same output as `manage.py spectacular --format openapi-json`
+    """
+    from drf_spectacular.renderers import OpenApiJsonRenderer
+    from drf_spectacular.settings import spectacular_settings
+    
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    return OpenApiJsonRenderer().render(schema, renderer_context={})
+
+
+def get_schema():
+    """
+    Return (body, etag) for the OpenAPI schema, loaded once per process.
+    The build-time artifact at OPENAPI_SCHEMA_FILE is used when present;
+    otherwise the schema is generated on first use.
+    """
+    global _schema
+    
+    if _schema is None:
+        with _schema_lock:
+            if _schema is None:
+                path = settings.OPENAPI_SCHEMA_FILE
+                if path and os.path.exists(path):
+                    with open(path, 'rb') as f:
+                        body = f.read()
+                else:
+                    body = generate_schema()
+                _schema = (body, '"%s"' % hashlib.sha256(body).hexdigest()[:32])
+    return _schema
+
+
+@require_GET
+@condition(etag_func=lambda request: get_schema()[1])
+def schema_view(request):
+    body, etag = get_schema()
+    response = HttpResponse(body, content_type='application/vnd.oai.openapi+json')
+    response['Cache-Control'] = 'no-cache'
+    return response
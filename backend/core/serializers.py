@@ -1,9 +1,22 @@
 # backend/core/serializers.py
 from rest_framework import serializers
+from users.serializers import ValuesSerializerMixin
 from .models import ExampleModel
 
-class ExampleModelSerializer(serializers.ModelSerializer):
+class ExampleModelSerializer(ValuesSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = ExampleModel
         fields = ['id', 'name', 'description', 'owner', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'created_at', 'updated_at', 'owner']
\ No newline at end of file
+        read_only_fields = ['id', 'created_at', 'updated_at', 'owner']
+
+class ExampleModelSummarySerializer(ValuesSerializerMixin, serializers.ModelSerializer):
+    """
+    List representation without the (potentially large) description
+    """
+    class Meta:
+        model = ExampleModel
+        fields = ['id', 'name', 'owner', 'created_at', 'updated_at']
+        read_only_fields = fields
+
+class BulkIdsSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=1000)
\ No newline at end of file
@@ -0,0 +1,155 @@
+# backend/core/sharding.py
+import bisect
+import hashlib
+from collections import Counter
+from django.conf import settings
+from django.db import models, router, transaction
+from django.db.models import Count
+from rest_framework.exceptions import ValidationError
+
+
+class HashRing:
+    """
+    Consistent-hash ring mapping owner ids to shard aliases.
+    Each shard gets `replicas` virtual points, so adding or removing a shard
+    only moves the owners whose points fall next to it.
+    """
+    def __init__(self, shards, replicas=100):
+        self.shards = list(shards)
+        self._points = []
+        self._owners = []
+        for shard in self.shards:
+            for replica in range(replicas):
+                self._points.append(self._hash(f'{shard}:{replica}'))
+                self._owners.append(shard)
+        order = sorted(range(len(self._points)), key=self._points.__getitem__)
+        self._points = [self._points[i] for i in order]
+        self._owners = [self._owners[i] for i in order]
+
+    @staticmethod
+    def _hash(key):
+        return int.from_bytes(hashlib.md5(str(key).encode()).digest()[:8], 'big')
+
+    def get_shard(self, owner_id):
+        if not self._points:
+            raise ValueError('HashRing has no shards')
+        index = bisect.bisect(self._points, self._hash(owner_id)) % len(self._points)
+        return self._owners[index]
+
+
+_ring = None
+
+
+def get_ring():
+    global _ring
+    
+    if _ring is None or _ring.shards != settings.SHARDS:
+        _ring = HashRing(settings.SHARDS)
+    return _ring
+
+
+def sharding_enabled():
+    return bool(settings.SHARD_DATABASES)
+
+
+def is_sharded_model(model):
+    """
+    Models derived from core.models.BaseModel are partitioned by owner, and so are their row counters
+    """
+    from .models import BaseModel, OwnerRowCount
+    return isinstance(model, type) and issubclass(model, (BaseModel, OwnerRowCount))
+
+
+def is_counted_model(model):
+    """
+    Models whose rows are counted per owner in core.models.OwnerRowCount
+    """
+    from .models import BaseModel
+    return isinstance(model, type) and issubclass(model, BaseModel)
+
+
+def shard_for_owner(owner_id):
+    if not sharding_enabled():
+        return 'default'
+    return get_ring().get_shard(owner_id)
+
+
+def shard_for_request(request):
+    """
+    Owners are routed to their own shard; superusers must pick one with ?shard=,
+    since a queryset cannot span databases (rather than silently seeing the first shard only)
+    """
+    if not sharding_enabled():
+        return 'default'
+    if request.user.is_superuser:
+        shard = request.query_params.get('shard')
+        if shard not in settings.SHARD_DATABASES:
+            raise ValidationError({'shard': f"Pick one of: {', '.join(settings.SHARD_DATABASES)}"})
+        return shard
+    return shard_for_owner(request.user.pk)
+
+
+def fan_out(queryset):
+    """
+    One queryset per shard, for superuser tooling that needs to look at every shard
+    """
+    if not sharding_enabled():
+        return [('default', queryset)]
+    return [(shard, queryset.using(shard)) for shard in settings.SHARD_DATABASES]
+
+
+class ShardedQuerySet(models.QuerySet):
+    def for_owner(self, owner_id):
+        return self.using(shard_for_owner(owner_id)).filter(owner_id=owner_id)
+        
+    def create(self, **kwargs):
+        # QuerySet.create() saves with using=self.db, which the router resolves without
+        # the instance; leave the database to Model.save() so the owner picks the shard
+        if self._db is not None or not sharding_enabled():
+            return super().create(**kwargs)
+        obj = self.model(**kwargs)
+        obj.save(force_insert=True)
+        return obj
+        
+    def bulk_create(self, objs, *args, **kwargs):
+        if self._db is not None or not sharding_enabled():
+            return self._counted_bulk_create(objs, *args, **kwargs)
+        by_shard = {}
+        for obj in objs:
+            by_shard.setdefault(shard_for_owner(obj.owner_id), []).append(obj)
+        for shard, shard_objs in by_shard.items():
+            self.using(shard).bulk_create(shard_objs, *args, **kwargs)
+        return objs
+        
+    def _counted_bulk_create(self, objs, *args, **kwargs):
+        from .models import OwnerRowCount
+        
+        objs = list(objs)
+        using = self._db or router.db_for_write(self.model, **self._hints)
+        with transaction.atomic(using=using, savepoint=False):
+            created = super().bulk_create(objs, *args, **kwargs)
+            counters = OwnerRowCount.objects.using(using)
+            if kwargs.get('ignore_conflicts') or kwargs.get('update_conflicts'):
+                # Conflicting rows are skipped or updated, so the inserted count is unknown: recount
+                for owner_id in {obj.owner_id for obj in objs}:
+                    count = self.model._default_manager.using(using).filter(owner_id=owner_id).count()
+                    counters.adjust(self.model, {owner_id: count - (counters.get_count(self.model, owner_id) or 0)})
+            else:
+                counters.adjust(self.model, Counter(obj.owner_id for obj in objs))
+        return created
+        
+    def delete(self):
+        from .models import OwnerRowCount
+        
+        using = self._db or router.db_for_write(self.model, **self._hints)
+        with transaction.atomic(using=using, savepoint=False):
+            deltas = dict(self.order_by().values('owner_id').annotate(rows=Count('pk')).values_list('owner_id', 'rows'))
+            deleted, per_model = super().delete()
+            if len(deltas) == 1:
+                # Exact even if concurrent writes changed the selection between the two queries
+                deltas = {owner_id: per_model.get(self.model._meta.label, 0) for owner_id in deltas}
+            OwnerRowCount.objects.using(using).adjust(self.model, {owner_id: -rows for owner_id, rows in deltas.items()})
+        return deleted, per_model
+        
+    delete.alters_data = True
+    delete.queryset_only = True
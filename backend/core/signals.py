@@ -0,0 +1,18 @@
+# backend/core/signals.py
+from django.apps import apps
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+from users.models import CustomUser
+from .sharding import fan_out, is_sharded_model
+
+@receiver(pre_delete, sender=CustomUser)
+def delete_owned_rows(sender, instance, **kwargs):
+    """
+    Cascade for BaseModel rows and their counters, which may live on a different database than their owner.
+    Every shard is cleared, not just the owner's: rows stay behind on a draining shard or an old
+    ring position until rebalance_shards moves them.
+    """
+    for model in apps.get_models():
+        if is_sharded_model(model):
+            for _, queryset in fan_out(model.objects.filter(owner_id=instance.pk)):
+                queryset.delete()
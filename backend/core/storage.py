@@ -0,0 +1,33 @@
+# backend/core/storage.py
+import logging
+import os
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from .compression import ENCODINGS, compress_file
+
+logger = logging.getLogger(__name__)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage that also writes .gz (and .br, when brotli is installed)
+    variants of every hashed file during collectstatic, for core.middleware.AssetMiddleware
+    """
+    def post_process(self, paths, dry_run=False, **options):
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            # Only hashed names get far-future caching, so only they are compressed
+            if not dry_run and hashed_name and not isinstance(processed, Exception):
+                path = self.path(hashed_name)
+                # Unchanged files keep the variants written by the previous run
+                if processed or not any(os.path.exists(path + suffix) for _, suffix in ENCODINGS):
+                    compress_file(path)
+            yield name, hashed_name, processed
+
+    def stored_name(self, name):
+        # Before the first collectstatic there is no manifest; fall back to unhashed names
+        # (revalidated, never cached as immutable) rather than failing every {% static %}
+        if not self.hashed_files:
+            if not getattr(self, '_warned_missing_manifest', False):
+                logger.warning('No staticfiles manifest in %s, serving unhashed static URLs; run collectstatic', self.location)
+                self._warned_missing_manifest = True
+            return name
+        return super().stored_name(name)
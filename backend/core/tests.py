@@ -1,3 +1,801 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import io
+import json
+import uuid
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from types import SimpleNamespace
+import os
+import shutil
+import tempfile
+from collections import Counter
+from unittest import mock, skipUnless
+from django.apps import apps
+from django.conf import settings
+from django.core import mail
+from django.core.management import call_command
+from django.db import connections
+from django.http import HttpResponse, HttpResponseNotFound, JsonResponse
+import django
+from django.test import LiveServerTestCase, RequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from users.models import CustomUser
+from users.serializers import UserSerializer, ValuesSerializerMixin
+from .compression import brotli, compress_file
+from .loadtest import Inbox, Stats, check_thresholds, get_scenario, percentile, run_scenario
+from .middleware import AssetMiddleware, CompressionMiddleware, NonAPIMiddlewareStack
+from .models import ExampleModel, OwnerRowCount
+from .pagination import CountedPageNumberPagination
+from .parsers import ORJSONParser
+from .renderers import ORJSONRenderer
+from .serializers import ExampleModelSerializer, ExampleModelSummarySerializer
+from . import schema
+from .profiling import run_probe
+from .routers import OwnerShardRouter
+from .sharding import HashRing, fan_out, shard_for_owner
+from .storage import CompressedManifestStaticFilesStorage
 
-# Create your tests here.
+# Generous on purpose: catches an accidental heavy import, not a few milliseconds of drift
+STARTUP_TIME_BUDGET = float(os.environ.get('STARTUP_TIME_BUDGET', 2.0))
+
+
+class StartupTests(SimpleTestCase):
+    production_env = {'DJANGO_API_DOCS': 'false', 'DJANGO_ADMIN': 'false', 'DJANGO_WARMUP_ON_STARTUP': 'false'}
+
+    def test_wsgi_import_within_budget(self):
+        result = run_probe('config.wsgi', env=self.production_env)
+        self.assertLess(result['elapsed'], STARTUP_TIME_BUDGET)
+
+    def test_asgi_import_within_budget(self):
+        result = run_probe('config.asgi', env=self.production_env)
+        self.assertLess(result['elapsed'], STARTUP_TIME_BUDGET)
+
+    def test_optional_apps_are_not_imported(self):
+        modules = run_probe('config.wsgi', env=self.production_env)['modules']
+        self.assertNotIn('drf_spectacular', modules)
+        self.assertNotIn('django.contrib.admin', modules)
+
+
+
+class WarmUpTests(SimpleTestCase):
+    def warm_up_connections(self, conn_max_age):
+        connection = connections['default']
+        with mock.patch.dict(connection.settings_dict, CONN_MAX_AGE=conn_max_age), \
+                mock.patch.object(connection, 'ensure_connection') as ensure_connection:
+            apps.get_app_config('core').warm_up_connections()
+        return ensure_connection.called
+
+    @override_settings(WARMUP_ON_STARTUP=True)
+    def test_connections_are_only_opened_when_kept(self):
+        self.assertFalse(self.warm_up_connections(0))
+        self.assertTrue(self.warm_up_connections(60))
+
+    @override_settings(WARMUP_ON_STARTUP=False)
+    def test_disabled(self):
+        self.assertFalse(self.warm_up_connections(60))
+
+
+class SchemaViewTests(SimpleTestCase):
+    """
+    The precomputed schema is served with an ETag and revalidated with If-None-Match
+    """
+    def setUp(self):
+        tmp = tempfile.NamedTemporaryFile(suffix='.json', delete=False)
+        tmp.write(b'{"openapi": "3.0.3"}')
+        tmp.close()
+        self.addCleanup(os.remove, tmp.name)
+        
+        patcher = override_settings(OPENAPI_SCHEMA_FILE=tmp.name)
+        patcher.enable()
+        self.addCleanup(patcher.disable)
+        schema._schema = None
+        self.addCleanup(setattr, schema, '_schema', None)
+        self.factory = RequestFactory()
+
+    def test_serves_file_with_etag(self):
+        response = schema.schema_view(self.factory.get('/api/schema/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'{"openapi": "3.0.3"}')
+        self.assertEqual(response['ETag'], schema.get_schema()[1])
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+
+    def test_matching_etag_is_not_modified(self):
+        etag = schema.schema_view(self.factory.get('/api/schema/'))['ETag']
+        response = schema.schema_view(self.factory.get('/api/schema/', HTTP_IF_NONE_MATCH=etag))
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        
+        response = schema.schema_view(self.factory.get('/api/schema/', HTTP_IF_NONE_MATCH='"stale"'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_only_get(self):
+        self.assertEqual(schema.schema_view(self.factory.post('/api/schema/')).status_code, 405)
+
+class ExampleModelPermissionQueryTests(APITestCase):
+    """
+    Ownership is checked through owner_id and the queryset filter, never by loading the owner row
+    """
+    databases = {'default', *settings.SHARD_DATABASES}
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = CustomUser.objects.create_user(username='owner', email='owner@example.com', password='pw')
+        cls.other = CustomUser.objects.create_user(username='other', email='other@example.com', password='pw')
+        cls.admin = CustomUser.objects.create_superuser(username='admin', email='admin@example.com', password='pw')
+        cls.obj = ExampleModel.objects.create(owner=cls.owner, name='mine', description='text')
+        # Explicit id: with sharding enabled ids are only unique per shard
+        cls.others_obj = ExampleModel.objects.create(id=10_000, owner=cls.other, name='theirs', description='text')
+
+    def setUp(self):
+        self.client.force_authenticate(self.owner)
+
+    def detail_url(self, obj):
+        return reverse('example-detail', args=[obj.pk])
+
+    def assertNumQueries(self, num, using=None):
+        # Queries run on the owner's shard ('default' without sharding)
+        return super().assertNumQueries(num, using=using or shard_for_owner(self.owner.pk))
+
+    def test_list(self):
+        # Counter + page
+        with self.assertNumQueries(2) as ctx:
+            response = self.client.get(reverse('example-list'))
+        self.assertEqual([row['id'] for row in response.data['results']], [self.obj.pk])
+        self.assertEqual(response.data['count'], 1)
+        self.assertNotIn('COUNT(', ctx.captured_queries[0]['sql'])
+
+    def test_list_does_not_read_description(self):
+        with self.assertNumQueries(2) as ctx:
+            response = self.client.get(reverse('example-list'))
+        self.assertNotIn('description', response.data['results'][0])
+        self.assertNotIn('description', ctx.captured_queries[1]['sql'])
+
+    def test_list_sparse_fields(self):
+        with self.assertNumQueries(2) as ctx:
+            response = self.client.get(reverse('example-list'), {'fields': 'id,description'})
+        self.assertEqual(response.data['results'], [{'id': self.obj.pk, 'description': 'text'}])
+        self.assertNotIn('"name"', ctx.captured_queries[1]['sql'])
+
+    def test_list_rejects_unknown_fields(self):
+        response = self.client.get(reverse('example-list'), {'fields': 'id,password'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_retrieve(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url(self.obj))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['description'], 'text')
+
+    def test_create(self):
+        # INSERT + counter
+        with self.assertNumQueries(2):
+            response = self.client.post(reverse('example-list'), {'name': 'new', 'description': 'text'})
+        self.assertEqual(response.status_code, 201)
+
+    def test_update(self):
+        with self.assertNumQueries(2):
+            response = self.client.put(self.detail_url(self.obj), {'name': 'renamed', 'description': 'text'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_partial_update(self):
+        with self.assertNumQueries(2):
+            response = self.client.patch(self.detail_url(self.obj), {'name': 'renamed'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_destroy(self):
+        # SELECT + DELETE + counter
+        with self.assertNumQueries(3):
+            response = self.client.delete(self.detail_url(self.obj))
+        self.assertEqual(response.status_code, 204)
+
+    def test_other_users_object_is_not_found(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url(self.others_obj))
+        self.assertEqual(response.status_code, 404)
+
+    def test_superuser_sees_all_objects(self):
+        self.client.force_authenticate(self.admin)
+        shard = shard_for_owner(self.other.pk)
+        with self.assertNumQueries(1, using=shard):
+            response = self.client.get(self.detail_url(self.others_obj), {'shard': shard})
+        self.assertEqual(response.status_code, 200)
+
+    def test_bulk_delete(self):
+        mine = ExampleModel.objects.create(owner=self.owner, name='mine too', description='text')
+        # SELECT + rows per owner + DELETE + counter
+        with self.assertNumQueries(4):
+            response = self.client.post(reverse('example-bulk-delete'), {'ids': [self.obj.pk, mine.pk]}, format='json')
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(ExampleModel.objects.for_owner(self.owner.pk).exists())
+
+    def test_bulk_delete_rejects_other_users_objects(self):
+        with self.assertNumQueries(1):
+            response = self.client.post(
+                reverse('example-bulk-delete'), {'ids': [self.obj.pk, self.others_obj.pk]}, format='json'
+            )
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(ExampleModel.objects.for_owner(self.owner.pk).exists())
+        self.assertTrue(ExampleModel.objects.for_owner(self.other.pk).exists())
+
+
+
+class ValuesSerializationParityTests(APITestCase):
+    """
+    The .values() list path renders exactly what the ModelSerializer renders, for every
+    serializer using it, so adding a field to one of them cannot make the two drift apart
+    """
+    databases = {'default', *settings.SHARD_DATABASES}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='parity', email='parity@example.com', password=None, date_of_birth=date(1990, 2, 3)
+        )
+        for i, created_at in enumerate([
+            datetime(2026, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc),
+            datetime(2026, 6, 30, 23, 59, 59, 123456, tzinfo=dt_timezone.utc),
+        ]):
+            obj = ExampleModel.objects.create(owner=cls.user, name=f'item \u2028 {i}', description='text ' * i)
+            ExampleModel.objects.for_owner(cls.user.pk).filter(pk=obj.pk).update(created_at=created_at)
+
+    def querysets(self):
+        return {
+            ExampleModelSerializer: ExampleModel.objects.for_owner(self.user.pk).order_by('id'),
+            ExampleModelSummarySerializer: ExampleModel.objects.for_owner(self.user.pk).order_by('id'),
+            UserSerializer: CustomUser.objects.filter(pk=self.user.pk),
+        }
+
+    def render(self, data):
+        return json.loads(ORJSONRenderer().render(data))
+
+    def assert_parity(self, serializer_class, queryset, fields=None):
+        expected = serializer_class(queryset, many=True).data
+        if fields:
+            expected = [{name: item[name] for name in fields} for item in expected]
+        rows = serializer_class.values_queryset(queryset, fields)
+        self.assertEqual(self.render(serializer_class.to_values_representation(rows, fields)), self.render(expected))
+
+    def test_every_values_serializer_is_covered(self):
+        self.assertEqual(set(ValuesSerializerMixin.__subclasses__()), set(self.querysets()))
+
+    def test_values_path_matches_model_serializer(self):
+        for zone in ('UTC', 'Asia/Tokyo', settings.TIME_ZONE):
+            for serializer_class, queryset in self.querysets().items():
+                with self.subTest(serializer=serializer_class.__name__, zone=zone), timezone.override(zone):
+                    self.assert_parity(serializer_class, queryset)
+
+    def test_sparse_fields_match_model_serializer(self):
+        queryset = self.querysets()[ExampleModelSerializer]
+        for fields in (['id'], ['name', 'created_at'], ExampleModelSerializer.Meta.fields):
+            with self.subTest(fields=fields):
+                self.assert_parity(ExampleModelSerializer, queryset, fields)
+
+
+class ORJSONTests(SimpleTestCase):
+    def test_renders_like_drf(self):
+        data = {
+            'utc': datetime(2026, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc),
+            'naive': datetime(2026, 1, 2, 3, 4, 5),
+            'date': date(2026, 1, 2),
+            'decimal': Decimal('1.10'),
+            'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'lazy': gettext_lazy('Login'),
+            'separators': 'a\u2028b\u2029c',
+            'nested': [{'n': 1}, None, True],
+        }
+        rendered = ORJSONRenderer().render(data)
+        self.assertEqual(json.loads(rendered), json.loads(JSONRenderer().render(data)))
+        self.assertNotIn('\u2028'.encode(), rendered)
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+    def test_indent_from_accept_header(self):
+        rendered = ORJSONRenderer().render({'a': 1}, 'application/json; indent=2')
+        self.assertEqual(rendered.count(b'\n'), 2)
+
+    def test_parser(self):
+        parse = lambda body: ORJSONParser().parse(io.BytesIO(body))
+        self.assertEqual(parse('{"name": "caf\u00e9", "n": [1, 2.5]}'.encode()), {'name': 'caf\u00e9', 'n': [1, 2.5]})
+        for body in (b'{"name": ', b'{"a": 1}}', b'\xff\xfe', b''):
+            with self.subTest(body=body), self.assertRaises(ParseError):
+                parse(body)
+
+    def test_malformed_body_is_a_400(self):
+        response = self.client.post(reverse('auth-login'), b'{"email": ', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('JSON parse error', response.json()['detail'])
+
+class OwnerRowCountTests(APITestCase):
+    databases = {'default', *settings.SHARD_DATABASES}
+
+    def setUp(self):
+        self.owner = CustomUser.objects.create_user(username='owner', email='owner@example.com', password=None)
+        self.counters = OwnerRowCount.objects.using(shard_for_owner(self.owner.pk))
+
+    def get_count(self):
+        return self.counters.get_count(ExampleModel, self.owner.pk)
+
+    def test_counter_follows_creates_and_deletes(self):
+        obj = ExampleModel.objects.create(owner=self.owner, name='one', description='text')
+        ExampleModel.objects.bulk_create([
+            ExampleModel(owner=self.owner, name=f'bulk {i}', description='text') for i in range(3)
+        ])
+        self.assertEqual(self.get_count(), 4)
+        
+        obj.delete()
+        self.assertEqual(self.get_count(), 3)
+        
+        ExampleModel.objects.for_owner(self.owner.pk).filter(name='bulk 0').delete()
+        self.assertEqual(self.get_count(), 2)
+
+    def test_deleting_owner_removes_counters(self):
+        ExampleModel.objects.create(owner=self.owner, name='one', description='text')
+        owner_id = self.owner.pk
+        self.owner.delete()
+        self.assertFalse(self.counters.filter(owner_id=owner_id).exists())
+
+    def list_page(self, count, page):
+        self.counters.filter(owner_id=self.owner.pk).update(count=count)
+        self.client.force_authenticate(self.owner)
+        return self.client.get(reverse('example-list'), {'page': page})
+
+    def test_list_count_comes_from_the_counter(self):
+        ExampleModel.objects.bulk_create([
+            ExampleModel(owner=self.owner, name=f'row {i}', description='text') for i in range(15)
+        ])
+        response = self.list_page(42, 1)
+        self.assertEqual(response.data['count'], 42)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_stale_counter_is_corrected_on_the_last_page(self):
+        ExampleModel.objects.bulk_create([
+            ExampleModel(owner=self.owner, name=f'row {i}', description='text') for i in range(15)
+        ])
+        for stale in (42, 3):
+            with self.subTest(stale=stale):
+                response = self.list_page(stale, 2)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.data['results']), 5)
+                self.assertEqual(response.data['count'], 15)
+                self.assertIsNone(response.data['next'])
+                self.assertEqual(self.list_page(stale, 3).status_code, 404)
+
+    def test_estimate_is_opt_in(self):
+        pagination = CountedPageNumberPagination()
+        queryset = ExampleModel.objects.all()
+        with mock.patch('core.pagination.estimated_count', return_value=200_000) as estimate:
+            self.assertIsNone(pagination.get_count(queryset, view=SimpleNamespace()))
+            estimate.assert_not_called()
+            self.assertEqual(pagination.get_count(queryset, view=SimpleNamespace(estimate_pagination_count=True)), 200_000)
+
+    def test_repair_fixes_drifted_counters(self):
+        ExampleModel.objects.create(owner=self.owner, name='one', description='text')
+        self.counters.filter(owner_id=self.owner.pk).update(count=42)
+        
+        call_command('repair_row_counts', stdout=open(os.devnull, 'w'))
+        self.assertEqual(self.get_count(), 1)
+
+
+
+class NonAPIMiddlewareStackTests(SimpleTestCase):
+    """
+    The 'api' deployment profile: sessions, auth and messages only run outside API_PATH_PREFIX
+    """
+    def setUp(self):
+        self.seen = {}
+        
+        def view(request):
+            self.seen = {name: hasattr(request, name) for name in ('session', 'user', '_messages')}
+            return HttpResponse()
+            
+        self.middleware = NonAPIMiddlewareStack(view)
+        self.factory = RequestFactory()
+
+    def test_api_requests_skip_the_stack(self):
+        self.middleware(self.factory.get('/api/examples/'))
+        self.assertEqual(self.seen, {'session': False, 'user': False, '_messages': False})
+
+    def test_other_requests_get_the_full_stack(self):
+        self.middleware(self.factory.get('/admin/login/'))
+        self.assertEqual(self.seen, {'session': True, 'user': True, '_messages': True})
+
+class AssetMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        os.makedirs(os.path.join(tmp.name, 'assets'))
+        with open(os.path.join(tmp.name, 'index.html'), 'w') as f:
+            f.write('<div id="root"></div>')
+        self.script = os.path.join(tmp.name, 'assets', 'index-Ab12Cd34.js')
+        with open(self.script, 'w') as f:
+            f.write('console.log("hello");\n' * 500)
+        compress_file(self.script)
+        
+        mounts = [('/', tmp.name, lambda name: name.startswith('assets/'))]
+        with override_settings(FRONTEND_DIST_DIR=tmp.name):
+            self.middleware = AssetMiddleware(lambda request: HttpResponseNotFound(), mounts=mounts)
+        self.factory = RequestFactory()
+
+    def test_serves_gzip_variant_with_immutable_caching(self):
+        response = self.middleware(self.factory.get('/assets/index-Ab12Cd34.js', HTTP_ACCEPT_ENCODING='gzip'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(int(response['Content-Length']), os.path.getsize(self.script + '.gz'))
+        self.assertEqual(response['Cache-Control'], AssetMiddleware.immutable_cache_control)
+        self.assertIn('Accept-Encoding', response['Vary'])
+        response.close()
+
+    def test_serves_identity_without_accept_encoding(self):
+        response = self.middleware(self.factory.get('/assets/index-Ab12Cd34.js'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(int(response['Content-Length']), os.path.getsize(self.script))
+        response.close()
+
+    def test_matching_etag_is_not_modified(self):
+        response = self.middleware(self.factory.get('/assets/index-Ab12Cd34.js', HTTP_ACCEPT_ENCODING='gzip'))
+        response.close()
+        response = self.middleware(self.factory.get(
+            '/assets/index-Ab12Cd34.js', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag']
+        ))
+        self.assertEqual(response.status_code, 304)
+
+    def test_client_routes_fall_back_to_index(self):
+        response = self.middleware(self.factory.get('/some/client/route', HTTP_ACCEPT='text/html'))
+        self.assertEqual(response['Cache-Control'], AssetMiddleware.revalidate_cache_control)
+        self.assertEqual(b''.join(response.streaming_content), b'<div id="root"></div>')
+        # Routes Django knows about are left alone
+        self.assertEqual(self.middleware(self.factory.get('/api/user/', HTTP_ACCEPT='text/html')).status_code, 404)
+
+
+
+
+class CompressAssetsTests(SimpleTestCase):
+    """
+    compress_assets on a dist tree holding real minified bundles (the ones Django ships)
+    """
+    bundles = ['admin/js/vendor/jquery/jquery.min.js', 'admin/js/vendor/select2/select2.full.min.js']
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dist = tmp.name
+        os.makedirs(os.path.join(self.dist, 'assets'))
+        source = os.path.join(os.path.dirname(django.__file__), 'contrib', 'admin', 'static')
+        self.files = {}
+        for i, bundle in enumerate(self.bundles):
+            name = f'assets/index-{i:08x}.js'
+            shutil.copy(os.path.join(source, bundle), os.path.join(self.dist, name))
+            with open(os.path.join(self.dist, name), 'rb') as f:
+                self.files[name] = f.read()
+        self.output = open(os.devnull, 'w')
+        self.addCleanup(self.output.close)
+
+    def serve(self, name, encoding):
+        middleware = AssetMiddleware(lambda request: HttpResponseNotFound(), mounts=[('/', self.dist, lambda name: True)])
+        response = middleware(RequestFactory().get('/' + name, HTTP_ACCEPT_ENCODING=encoding))
+        body = b''.join(response.streaming_content)
+        response.close()
+        return response, body
+
+    def test_bundles_are_served_precompressed(self):
+        call_command('compress_assets', self.dist, stdout=self.output)
+        
+        for name, content in self.files.items():
+            response, body = self.serve(name, 'gzip')
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertLess(len(body), len(content) / 2)
+            self.assertEqual(gzip.decompress(body), content)
+            if brotli is not None:
+                response, body = self.serve(name, 'br, gzip')
+                self.assertEqual(response['Content-Encoding'], 'br')
+                self.assertEqual(brotli.decompress(body), content)
+
+    def test_stale_variants_are_ignored_and_refreshed(self):
+        call_command('compress_assets', self.dist, stdout=self.output)
+        name = next(iter(self.files))
+        path = os.path.join(self.dist, name)
+        # As if the bundle was rebuilt after the variants were written
+        stamp = os.path.getmtime(path) - 10
+        for variant in (path + '.gz', path + '.br'):
+            if os.path.exists(variant):
+                os.utime(variant, (stamp, stamp))
+        
+        response, _ = self.serve(name, 'gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        
+        call_command('compress_assets', self.dist, stdout=self.output)
+        response, _ = self.serve(name, 'gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+class CompressedManifestStorageTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+
+    def test_missing_manifest_falls_back_to_unhashed_urls(self):
+        storage = CompressedManifestStaticFilesStorage(location=self.root)
+        self.assertEqual(storage.url('admin/css/base.css'), '/static/admin/css/base.css')
+
+    @skipUnless(settings.ADMIN_ENABLED, 'admin is disabled')
+    def test_admin_renders_before_collectstatic(self):
+        with override_settings(STATIC_ROOT=self.root, DEBUG=False):
+            self.assertEqual(self.client.get('/admin/login/').status_code, 200)
+
+    def test_collected_files_are_hashed_and_compressed(self):
+        with open(os.path.join(self.root, 'app.css'), 'w') as f:
+            f.write('body { color: red; }\n' * 100)
+        storage = CompressedManifestStaticFilesStorage(location=self.root)
+        list(storage.post_process({'app.css': (storage, 'app.css')}))
+        
+        url = CompressedManifestStaticFilesStorage(location=self.root).url('app.css')
+        self.assertRegex(url, r'^/static/app\.[0-9a-f]{12}\.css$')
+        self.assertTrue(os.path.exists(os.path.join(self.root, url[len('/static/'):] + '.gz')))
+
+@override_settings(RESPONSE_COMPRESSION={'MIN_SIZE': 1024})
+class CompressionMiddlewareTests(SimpleTestCase):
+    def compress(self, response, path='/api/examples/', encoding='gzip, br'):
+        request = RequestFactory().get(path, HTTP_ACCEPT_ENCODING=encoding)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_large_api_response_is_compressed(self):
+        response = self.compress(JsonResponse({'results': ['x' * 100] * 50}))
+        self.assertIn(response['Content-Encoding'], ('br', 'gzip'))
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+
+    def test_small_and_non_api_responses_are_left_alone(self):
+        self.assertFalse(self.compress(JsonResponse({'ok': True})).has_header('Content-Encoding'))
+        self.assertFalse(self.compress(HttpResponse('x' * 5000), path='/admin/').has_header('Content-Encoding'))
+
+
+
+class LoadTestStatsTests(SimpleTestCase):
+    def test_percentile_is_nearest_rank(self):
+        values = [0.01 * i for i in range(1, 101)]
+        self.assertEqual(percentile(values, 50), values[49])
+        self.assertEqual(percentile(values, 95), values[94])
+        self.assertEqual(percentile([0.2], 99), 0.2)
+        self.assertEqual(percentile([], 95), 0.0)
+
+    def test_thresholds(self):
+        stats = Stats()
+        stats.journeys.update(started=2, completed=1, failed=1)
+        for _ in range(19):
+            stats.record('GET /api/user/', 0.01, ok=True)
+        stats.record('GET /api/user/', 0.5, ok=False)
+        report = stats.report()
+        
+        self.assertEqual(check_thresholds(report, {'max_error_rate': 0.1, 'p95_ms': {'*': 100}}), [])
+        failures = check_thresholds(report, {'max_error_rate': 0, 'max_failed_journeys': 0, 'p95_ms': {'GET /api/user/': 5}})
+        self.assertEqual(len(failures), 3)
+
+
+class LoadTestJourneyTests(LiveServerTestCase):
+    """
+    The smoke scenario runs end to end against a live server
+    """
+    databases = {'default', *settings.SHARD_DATABASES}
+
+    async def follow_outbox(self, inbox):
+        seen = 0
+        while True:
+            for message in mail.outbox[seen:]:
+                for line in message.message().as_string().splitlines():
+                    inbox.feed_line(line)
+            seen = len(mail.outbox)
+            await asyncio.sleep(0.01)
+
+    async def run_journeys(self, scenario):
+        inbox = Inbox()
+        follower = asyncio.create_task(self.follow_outbox(inbox))
+        try:
+            return (await run_scenario(self.live_server_url, scenario, inbox)).report()
+        finally:
+            follower.cancel()
+
+    def test_smoke_scenario(self):
+        scenario = get_scenario('smoke', {'journeys': 1, 'timeout': 10})
+        report = asyncio.run(self.run_journeys(scenario))
+        
+        self.assertEqual(report['failures'], {})
+        self.assertEqual(report['journeys']['completed'], 1)
+        self.assertEqual(check_thresholds(report, scenario['thresholds']), [])
+        self.assertIn('DELETE /api/examples/{id}/', report['endpoints'])
+        self.assertFalse(any(queryset.exists() for _, queryset in fan_out(ExampleModel.objects.all())))
+
+class HashRingTests(SimpleTestCase):
+    def test_mapping_is_stable(self):
+        ring = HashRing(['shard0', 'shard1', 'shard2'])
+        self.assertEqual(
+            [ring.get_shard(owner_id) for owner_id in range(100)],
+            [HashRing(['shard0', 'shard1', 'shard2']).get_shard(owner_id) for owner_id in range(100)],
+        )
+
+    def test_owners_spread_over_all_shards(self):
+        ring = HashRing(['shard0', 'shard1', 'shard2'])
+        counts = Counter(ring.get_shard(owner_id) for owner_id in range(3000))
+        self.assertEqual(set(counts), {'shard0', 'shard1', 'shard2'})
+        self.assertGreater(min(counts.values()), 500)
+
+    def test_adding_a_shard_only_moves_owners_to_it(self):
+        before = HashRing(['shard0', 'shard1'])
+        after = HashRing(['shard0', 'shard1', 'shard2'])
+        for owner_id in range(1000):
+            if before.get_shard(owner_id) != after.get_shard(owner_id):
+                self.assertEqual(after.get_shard(owner_id), 'shard2')
+
+
+
+class OwnerForeignKeyTests(APITestCase):
+    databases = {'default', *settings.SHARD_DATABASES}
+
+    def test_schema_has_no_owner_constraint(self):
+        # Identical with and without DB_SHARD_URLS: shards have no users table to reference
+        for shard, _ in fan_out(ExampleModel.objects.all()):
+            with connections[shard].cursor() as cursor:
+                for model in (ExampleModel, OwnerRowCount):
+                    constraints = connections[shard].introspection.get_constraints(cursor, model._meta.db_table)
+                    self.assertFalse([name for name, info in constraints.items() if info['foreign_key']])
+
+    def test_deleting_owner_deletes_rows(self):
+        user = CustomUser.objects.create_user(username='fk', email='fk@example.com', password=None)
+        ExampleModel.objects.create(owner=user, name='one', description='text')
+        user.delete()
+        for shard, queryset in fan_out(ExampleModel.objects.all()):
+            self.assertFalse(queryset.exists())
+            self.assertFalse(OwnerRowCount.objects.using(shard).exists())
+
+@skipUnless(len(settings.SHARDS) >= 2, 'set DB_SHARD_URLS to at least two databases, e.g. sqlite:////tmp/shard0.sqlite3')
+class ShardingTests(APITestCase):
+    databases = {'default', *settings.SHARD_DATABASES}
+
+    def setUp(self):
+        self.users = [
+            CustomUser.objects.create_user(username=f'user{i}', email=f'user{i}@example.com', password=None)
+            for i in range(20)
+        ]
+
+    def create_objects(self, user, count=2):
+        for i in range(count):
+            ExampleModel.objects.create(owner=user, name=f'{user.username}-{i}', description='text')
+
+    def rows_by_shard(self):
+        return {shard: ExampleModel.objects.using(shard).count() for shard in settings.SHARD_DATABASES}
+
+    def test_writes_and_reads_follow_the_owner(self):
+        for user in self.users:
+            self.create_objects(user)
+            
+        for user in self.users:
+            shard = shard_for_owner(user.pk)
+            self.assertEqual(ExampleModel.objects.for_owner(user.pk).count(), 2)
+            for other in settings.SHARD_DATABASES:
+                expected = 2 if other == shard else 0
+                self.assertEqual(ExampleModel.objects.using(other).filter(owner_id=user.pk).count(), expected)
+        self.assertTrue(all(self.rows_by_shard().values()))
+
+    def test_api_scopes_owner_to_their_shard(self):
+        user = self.users[0]
+        self.client.force_authenticate(user)
+        response = self.client.post(reverse('example-list'), {'name': 'api', 'description': 'text'})
+        self.assertEqual(response.status_code, 201)
+        obj = ExampleModel.objects.for_owner(user.pk).get()
+        
+        response = self.client.get(reverse('example-detail', args=[obj.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['name'], 'api')
+
+    def test_deleting_user_clears_their_shard(self):
+        user = self.users[0]
+        self.create_objects(user)
+        # Not yet moved by rebalance_shards, e.g. after DB_SHARDS_DRAINING changed
+        stale = next(shard for shard in settings.SHARD_DATABASES if shard != shard_for_owner(user.pk))
+        ExampleModel.objects.using(stale).create(owner=user, name='stale', description='text')
+        owner_id = user.pk
+        user.delete()
+        for shard, queryset in fan_out(ExampleModel.objects.filter(owner_id=owner_id)):
+            self.assertFalse(queryset.exists())
+            self.assertFalse(OwnerRowCount.objects.using(shard).filter(owner_id=owner_id).exists())
+
+    def test_rebalance_moves_rows_off_a_draining_shard(self):
+        for user in self.users:
+            self.create_objects(user)
+        total = sum(self.rows_by_shard().values())
+        remaining = settings.SHARD_DATABASES[0]
+        
+        with override_settings(SHARDS=[remaining]):
+            call_command('rebalance_shards', stdout=open(os.devnull, 'w'))
+            
+        counts = self.rows_by_shard()
+        self.assertEqual(counts[remaining], total)
+        self.assertEqual(sum(counts.values()), total)
+        self.assertEqual(OwnerRowCount.objects.using(remaining).total(ExampleModel), total)
+
+    def test_superuser_must_name_a_shard(self):
+        admin = CustomUser.objects.create_superuser(username='admin', email='admin@example.com', password=None)
+        self.client.force_authenticate(admin)
+        user = self.users[0]
+        self.create_objects(user)
+        
+        self.assertEqual(self.client.get(reverse('example-list')).status_code, 400)
+        self.assertEqual(self.client.get(reverse('example-list'), {'shard': 'nope'}).status_code, 400)
+        response = self.client.get(reverse('example-list'), {'shard': shard_for_owner(user.pk)})
+        self.assertEqual(response.data['count'], 2)
+
+    @skipUnless(settings.ADMIN_ENABLED, 'admin is disabled')
+    def test_admin_search_covers_every_shard(self):
+        admin = CustomUser.objects.create_superuser(username='admin', email='admin@example.com', password=None)
+        self.client.force_login(admin)
+        user = self.users[0]
+        ExampleModel.objects.create(owner=user, name='needle', description='text')
+        shard = shard_for_owner(user.pk)
+        url = reverse('admin:core_examplemodel_changelist')
+        
+        # Lands on the shard with matches instead of silently searching the first one
+        response = self.client.get(url, {'q': 'needle'})
+        self.assertRedirects(response, f'{url}?q=needle&shard={shard}', fetch_redirect_response=False)
+        response = self.client.get(url, {'q': 'needle', 'shard': shard})
+        self.assertContains(response, 'needle')
+        for other in settings.SHARD_DATABASES:
+            self.assertContains(response, f'{other} ({int(other == shard)})')
+
+    def test_router_keeps_users_on_default(self):
+        router = OwnerShardRouter()
+        self.assertEqual(router.db_for_read(CustomUser), 'default')
+        self.assertTrue(router.allow_migrate(settings.SHARD_DATABASES[0], 'core', 'examplemodel'))
+        self.assertFalse(router.allow_migrate(settings.SHARD_DATABASES[0], 'users', 'customuser'))
+        self.assertFalse(router.allow_migrate('default', 'core', 'examplemodel'))
+
+    def test_unscoped_reads_are_logged(self):
+        router = OwnerShardRouter()
+        with self.assertLogs('core.routers', 'WARNING'):
+            self.assertEqual(router.db_for_read(ExampleModel), settings.SHARDS[0])
+        with self.assertNoLogs('core.routers', 'WARNING'):
+            list(ExampleModel.objects.for_owner(self.users[0].pk))
+
+
+@skipUnless(len(settings.SHARDS) >= 2, 'set DB_SHARD_URLS to at least two databases, e.g. sqlite:////tmp/shard0.sqlite3')
+class RebalanceFromDefaultTests(APITestCase):
+    """
+    Rows written before DB_SHARD_URLS was set stay on `default` until `rebalance_shards --from default`
+    """
+    databases = {'default', *settings.SHARD_DATABASES}
+
+    @classmethod
+    def setUpClass(cls):
+        # Migrations leave `default` without BaseModel tables once sharding is on;
+        # SQLite only allows schema changes outside the class transaction
+        with connections['default'].schema_editor() as editor:
+            editor.create_model(ExampleModel)
+            editor.create_model(OwnerRowCount)
+        cls.addClassCleanup(cls.drop_default_tables)
+        super().setUpClass()
+
+    @classmethod
+    def drop_default_tables(cls):
+        with connections['default'].schema_editor() as editor:
+            editor.delete_model(ExampleModel)
+            editor.delete_model(OwnerRowCount)
+
+    def test_moves_rows_and_counters_to_the_owner_shards(self):
+        users = [
+            CustomUser.objects.create_user(username=f'user{i}', email=f'user{i}@example.com', password=None)
+            for i in range(20)
+        ]
+        for user in users:
+            for i in range(2):
+                ExampleModel.objects.using('default').create(owner=user, name=f'{user.username}-{i}', description='text')
+        self.assertEqual(OwnerRowCount.objects.using('default').total(ExampleModel), 40)
+        
+        call_command('rebalance_shards', '--from', 'default', stdout=open(os.devnull, 'w'))
+        
+        self.assertFalse(ExampleModel.objects.using('default').exists())
+        self.assertEqual(OwnerRowCount.objects.using('default').total(ExampleModel), 0)
+        for user in users:
+            self.assertEqual(ExampleModel.objects.for_owner(user.pk).count(), 2)
+            counters = OwnerRowCount.objects.using(shard_for_owner(user.pk))
+            self.assertEqual(counters.get_count(ExampleModel, user.pk), 2)
@@ -1,20 +1,90 @@
 # backend/core/views.py
-from rest_framework import viewsets, generics
+from rest_framework import viewsets, generics, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from .models import ExampleModel
-from .serializers import ExampleModelSerializer
+from rest_framework.settings import api_settings
+from .models import ExampleModel, OwnerRowCount
+from .serializers import ExampleModelSerializer, ExampleModelSummarySerializer, BulkIdsSerializer
+from .sharding import shard_for_request
 from users.models import CustomUser
 from users.serializers import UserSerializer
-from users.permissions import IsOwnerOrAdmin
+from users.filters import IsOwnerOrAdminFilterBackend
+from users.permissions import IsOwnerOrAdmin, BulkObjectPermissionsMixin
 
-class ExampleModelViewSet(viewsets.ModelViewSet):
-    queryset = ExampleModel.objects.all()
+class ExampleModelViewSet(BulkObjectPermissionsMixin, viewsets.ModelViewSet):
+    queryset = ExampleModel.objects.order_by('-id')
     serializer_class = ExampleModelSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrAdmin]
+    # Ownership is enforced in SQL for list and object lookups alike
+    filter_backends = [*api_settings.DEFAULT_FILTER_BACKENDS, IsOwnerOrAdminFilterBackend]
+    
+    def get_queryset(self):
+        # Each owner's rows live on one shard ('default' when sharding is off)
+        return super().get_queryset().using(shard_for_request(self.request))
+        
+    def get_serializer_class(self):
+        if self.action == 'bulk_delete':
+            return BulkIdsSerializer
+        if self.action == 'list':
+            return ExampleModelSummarySerializer
+        return ExampleModelSerializer
+    
+    def get_list_fields(self):
+        """
+        Sparse fieldset from ?fields=id,name,description; None means the summary fields
+        """
+        fields = [name.strip() for name in self.request.query_params.get('fields', '').split(',') if name.strip()]
+        if not fields:
+            return None
+        
+        unknown = [name for name in fields if name not in ExampleModelSerializer.Meta.fields]
+        if unknown:
+            raise ValidationError({'fields': f"Unknown fields: {', '.join(unknown)}"})
+        return fields
+    
+    def get_pagination_count(self, queryset):
+        """
+        List total from OwnerRowCount; valid because the list is only filtered by owner
+        """
+        counters = OwnerRowCount.objects.using(queryset.db)
+        if self.request.user.is_superuser:
+            # Superusers list every row on the selected shard
+            return counters.total(ExampleModel)
+        return counters.get_count(ExampleModel, self.request.user.pk)
+    
+    def list(self, request, *args, **kwargs):
+        # Lean read path: pages are built from .values() rows instead of model instances,
+        # and only the listed columns are selected, so description is never read unless asked for
+        fields = self.get_list_fields()
+        serializer_class = ExampleModelSerializer if fields else self.get_serializer_class()
+        queryset = serializer_class.values_queryset(self.filter_queryset(self.get_queryset()), fields)
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer_class.to_values_representation(page, fields))
+        
+        return Response(serializer_class.to_values_representation(queryset, fields))
     
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
+        
+    @action(detail=False, methods=['post'])
+    def bulk_delete(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = set(serializer.validated_data['ids'])
+        
+        # One query for the whole batch; only the columns permissions look at
+        objs = list(self.filter_queryset(self.get_queryset()).filter(pk__in=ids).only('id', 'owner_id'))
+        if len(objs) != len(ids):
+            raise NotFound()
+            
+        self.check_bulk_object_permissions(request, objs)
+        self.get_queryset().filter(pk__in=ids).delete()
+        
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 class CurrentUserView(generics.RetrieveAPIView):
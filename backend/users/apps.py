@@ -1,6 +1,34 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        if settings.WARMUP_ON_STARTUP:
+            self.warm_up()
+
+    def warm_up(self):
+        """
+        Build serializer fields once so lazy imports and validators are loaded before the first request
+        """
+        from .serializers import (
+            UserSerializer,
+            RegisterSerializer,
+            LoginSerializer,
+            PasswordResetRequestSerializer,
+            PasswordResetSerializer,
+        )
+
+        for serializer_class in (
+            UserSerializer,
+            RegisterSerializer,
+            LoginSerializer,
+            PasswordResetRequestSerializer,
+            PasswordResetSerializer,
+        ):
+            serializer_class().fields
@@ -0,0 +1,168 @@
+# backend/users/audit.py
+import atexit
+import json
+import os
+import threading
+from collections import deque
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+
+class DatabaseSink:
+    """
+    Writes a batch of events as AuthEvent rows with a single bulk_create
+    """
+    def __init__(self, config):
+        self.batch_size = config.get('FLUSH_SIZE', 500)
+
+    def write(self, events):
+        from django.db import close_old_connections
+        from .models import AuthEvent
+
+        # Runs on the flusher thread, which has its own connection and no request cycle to recycle it
+        close_old_connections()
+        AuthEvent.objects.bulk_create(
+            [AuthEvent(**event) for event in events],
+            batch_size=self.batch_size,
+        )
+
+
+class NDJSONSink:
+    """
+    Appends events to a newline-delimited JSON file, one object per line.
+    The file is reopened on every flush, so it can be rotated by renaming it.
+    """
+    def __init__(self, config):
+        self.path = config.get('NDJSON_PATH') or os.path.join(settings.BASE_DIR, 'auth_events.ndjson')
+
+    def write(self, events):
+        lines = ''.join(
+            json.dumps({**event, 'created_at': event['created_at'].isoformat()}) + '\n'
+            for event in events
+        )
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+
+
+class AuditLog:
+    """
+    Per-worker in-memory buffer of auth events, flushed by a background thread
+    when FLUSH_SIZE events are waiting or every FLUSH_INTERVAL seconds.
+
+    record() never blocks on I/O: once MAX_BUFFER events are waiting, new events
+    are dropped and counted instead.
+    """
+    def __init__(self, sink, max_buffer=10000, flush_size=500, flush_interval=5.0):
+        self.sink = sink
+        self.max_buffer = max_buffer
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.metrics = {'recorded': 0, 'dropped': 0, 'flushed': 0, 'flush_errors': 0}
+        self._buffer = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def record(self, event_type, user=None, email='', request=None):
+        event = {
+            'event_type': event_type,
+            'user_id': user.pk if user is not None else None,
+            'email': email or (user.email if user is not None else ''),
+            'ip_address': request.META.get('REMOTE_ADDR') if request is not None else None,
+            'created_at': timezone.now(),
+        }
+
+        with self._lock:
+            if len(self._buffer) >= self.max_buffer:
+                self.metrics['dropped'] += 1
+                return
+            self._buffer.append(event)
+            self.metrics['recorded'] += 1
+            pending = len(self._buffer)
+
+        if pending >= self.flush_size:
+            self._wakeup.set()
+
+    def flush(self):
+        # One flush at a time, so the background thread and atexit never interleave batches
+        with self._flush_lock:
+            with self._lock:
+                events = list(self._buffer)
+                self._buffer.clear()
+            if not events:
+                return 0
+
+            try:
+                self.sink.write(events)
+            except Exception:
+                # Memory stays bounded: a failed batch is dropped, not retried
+                self.metrics['flush_errors'] += 1
+                self.metrics['dropped'] += len(events)
+                return 0
+
+            self.metrics['flushed'] += len(events)
+            return len(events)
+
+    def get_metrics(self):
+        with self._lock:
+            return dict(self.metrics, buffered=len(self._buffer), sink=type(self.sink).__name__)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='auth-audit', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+
+_audit_log = None
+_audit_log_pid = None
+_audit_log_lock = threading.Lock()
+
+
+def get_audit_log():
+    """
+    Return this process's AuditLog, starting its flusher on first use (again after a fork)
+    """
+    global _audit_log, _audit_log_pid
+
+    pid = os.getpid()
+    if _audit_log is not None and _audit_log_pid == pid:
+        return _audit_log
+
+    with _audit_log_lock:
+        if _audit_log is None or _audit_log_pid != pid:
+            config = settings.AUTH_AUDIT
+            _audit_log = AuditLog(
+                import_string(config['SINK'])(config),
+                max_buffer=config.get('MAX_BUFFER', 10000),
+                flush_size=config.get('FLUSH_SIZE', 500),
+                flush_interval=config.get('FLUSH_INTERVAL', 5.0),
+            )
+            _audit_log.start()
+            _audit_log_pid = pid
+            # Flush what is left when the worker shuts down
+            atexit.register(_audit_log.stop)
+    return _audit_log
+
+
+def record_event(event_type, user=None, email='', request=None):
+    if settings.AUTH_AUDIT['ENABLED']:
+        get_audit_log().record(event_type, user=user, email=email, request=request)
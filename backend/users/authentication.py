@@ -3,9 +3,10 @@ import jwt
 from datetime import datetime, timedelta
 from django.conf import settings
 from django.utils import timezone
-from rest_framework.authentication import BaseAuthentication
-from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.authentication import BaseAuthentication, CSRFCheck
+from rest_framework.exceptions import AuthenticationFailed, PermissionDenied
 from .models import CustomUser, BlacklistedToken
+from .invalidation import get_bus
 
 def create_jwt_pair(user):
     """
@@ -21,7 +22,7 @@ def create_jwt_pair(user):
     access_token = jwt.encode(payload, settings.SECRET_KEY, algorithm='HS256')
     refresh_token = jwt.encode({
         **payload,
-        'exp': datetime.utcnow() + timedelta(seconds=settings.JWT_REFRESH_TOKEN_EXPIRATION)
+        'exp': datetime.utcnow() + timedelta(seconds=settings.JWT_AUTH['JWT_REFRESH_TOKEN_EXPIRATION'])
     }, settings.SECRET_KEY, algorithm='HS256')
     
     return access_token, refresh_token
@@ -43,15 +44,24 @@ class JWTAuthentication(BaseAuthentication):
         except jwt.InvalidTokenError:
             raise AuthenticationFailed('Invalid token')
             
-        if BlacklistedToken.objects.filter(token=access_token).exists():
-            raise AuthenticationFailed('Token has been blacklisted')
+        cache = get_bus().cache
+        
+        # Tokens and users cached by this worker are evicted through the invalidation bus
+        # when another worker revokes the token or saves the user.
+        if cache.get_token(access_token) is None:
+            if BlacklistedToken.objects.filter(token=access_token).exists():
+                raise AuthenticationFailed('Token has been blacklisted')
+            cache.add_token(access_token, payload['user_id'], payload['exp'])
             
         user_id = payload['user_id']
+        user = cache.get_user(user_id)
         
-        try:
-            user = CustomUser.objects.get(pk=user_id)
-        except CustomUser.DoesNotExist:
-            raise AuthenticationFailed('User not found')
+        if user is None:
+            try:
+                user = CustomUser.objects.get(pk=user_id)
+            except CustomUser.DoesNotExist:
+                raise AuthenticationFailed('User not found')
+            cache.add_user(user)
             
         if not user.is_active:
             raise AuthenticationFailed('User is inactive')
@@ -59,7 +69,22 @@ class JWTAuthentication(BaseAuthentication):
         if payload['exp'] < int(timezone.now().timestamp()):
             raise AuthenticationFailed('Access token expired')
             
+        # Cookies are sent automatically by the browser, so unsafe requests must also
+        # carry the CSRF token header (API views are csrf_exempt)
+        if settings.JWT_AUTH['JWT_CSRF_PROTECTION']:
+            self.enforce_csrf(request)
+            
         return (user, None)
         
+    def enforce_csrf(self, request):
+        def dummy_get_response(request):
+            return None
+            
+        check = CSRFCheck(dummy_get_response)
+        check.process_request(request)
+        reason = check.process_view(request, None, (), {})
+        if reason:
+            raise PermissionDenied('CSRF Failed: %s' % reason)
+        
     def authenticate_header(self, request):
         return 'Bearer'
\ No newline at end of file
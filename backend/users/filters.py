@@ -0,0 +1,14 @@
+# backend/users/filters.py
+from rest_framework.filters import BaseFilterBackend
+
+class IsOwnerOrAdminFilterBackend(BaseFilterBackend):
+    """
+    Queryset counterpart of IsOwnerOrAdmin: non-superusers only see rows they own.
+    Set `owner_field` on the view if the foreign key is not called `owner`.
+    """
+    def filter_queryset(self, request, queryset, view):
+        if request.user.is_superuser:
+            return queryset
+            
+        owner_field = getattr(view, 'owner_field', 'owner')
+        return queryset.filter(**{f'{owner_field}_id': request.user.pk})
@@ -0,0 +1,311 @@
+# backend/users/invalidation.py
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+TOKEN_REVOKED = 'token_revoked'
+USER_CHANGED = 'user_changed'
+
+
+class AuthCache:
+    """
+    Per-worker cache of verified access tokens and user rows used by JWTAuthentication.
+    A ttl of 0 disables caching entirely. Each dict keeps at most max_size entries,
+    evicting the least recently used; expired entries are dropped when they are looked up.
+    """
+    def __init__(self, ttl=0, max_size=10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._tokens = OrderedDict()
+        self._users = OrderedDict()
+
+    def _get(self, entries, key):
+        with self._lock:
+            entry = entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.time():
+                del entries[key]
+                return None
+            entries.move_to_end(key)
+            return entry[0]
+
+    def _add(self, entries, key, value, expires_at):
+        with self._lock:
+            entries[key] = (value, expires_at)
+            entries.move_to_end(key)
+            while len(entries) > self.max_size:
+                entries.popitem(last=False)
+
+    def get_token(self, token):
+        return self._get(self._tokens, token)
+
+    def add_token(self, token, user_id, exp):
+        if self.ttl <= 0:
+            return
+        self._add(self._tokens, token, str(user_id), min(exp, time.time() + self.ttl))
+
+    def revoke_token(self, token):
+        with self._lock:
+            self._tokens.pop(token, None)
+
+    def get_user(self, user_id):
+        row = self._get(self._users, str(user_id))
+        if row is None:
+            return None
+        # A new instance per request, so concurrent requests never share (or mutate) one object
+        model, db, field_names, values = row
+        return model.from_db(db, field_names, values)
+
+    def add_user(self, user):
+        if self.ttl <= 0:
+            return
+        field_names = [field.attname for field in user._meta.concrete_fields]
+        row = (type(user), user._state.db, field_names, [getattr(user, name) for name in field_names])
+        self._add(self._users, str(user.pk), row, time.time() + self.ttl)
+
+    def evict_user(self, user_id):
+        with self._lock:
+            self._users.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
+            self._users.clear()
+
+
+class BaseTransport:
+    """
+    A transport delivers serialized events between workers.
+    listen() blocks until stop_event is set, calling callback for every message;
+    it sets `subscribed` once messages published from then on will be delivered.
+    """
+    def __init__(self, config):
+        self.config = config
+        self.subscribed = threading.Event()
+
+    def publish(self, message):
+        raise NotImplementedError
+
+    def listen(self, callback, stop_event):
+        raise NotImplementedError
+
+
+class LocalTransport(BaseTransport):
+    """
+    Single-process transport: events are only applied in the worker that published them.
+    """
+    def publish(self, message):
+        pass
+
+    def listen(self, callback, stop_event):
+        self.subscribed.set()
+        stop_event.wait()
+
+
+class RedisTransport(BaseTransport):
+    """
+    Redis (or any server speaking the Redis pub/sub protocol) transport.
+    """
+    def __init__(self, config):
+        super().__init__(config)
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured('RedisTransport requires the "redis" package')
+
+        self.client = redis.Redis.from_url(config['REDIS_URL'])
+        self.channel = config.get('CHANNEL', 'auth-invalidation')
+
+    def publish(self, message):
+        self.client.publish(self.channel, message)
+
+    def listen(self, callback, stop_event):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.channel)
+        self.subscribed.set()
+        try:
+            while not stop_event.is_set():
+                item = pubsub.get_message(timeout=1.0)
+                if item and item['type'] == 'message':
+                    data = item['data']
+                    callback(data.decode() if isinstance(data, bytes) else data)
+        finally:
+            self.subscribed.clear()
+            pubsub.close()
+
+
+class SQLiteTransport(BaseTransport):
+    """
+    Polls a shared SQLite file for new events.
+    Meant for tests and single-host deployments without Redis.
+    """
+    RETENTION = 300
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.path = config.get('SQLITE_PATH') or os.path.join(settings.BASE_DIR, 'invalidation.sqlite3')
+        self.poll_interval = config.get('POLL_INTERVAL', 0.5)
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS events '
+                '(id INTEGER PRIMARY KEY AUTOINCREMENT, message TEXT NOT NULL, created_at REAL NOT NULL)'
+            )
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def publish(self, message):
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('INSERT INTO events (message, created_at) VALUES (?, ?)', (message, now))
+                conn.execute('DELETE FROM events WHERE created_at < ?', (now - self.RETENTION,))
+        finally:
+            conn.close()
+
+    def listen(self, callback, stop_event):
+        conn = self._connect()
+        try:
+            last_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM events').fetchone()[0]
+            self.subscribed.set()
+            while not stop_event.wait(self.poll_interval):
+                rows = conn.execute(
+                    'SELECT id, message FROM events WHERE id > ? ORDER BY id', (last_id,)
+                ).fetchall()
+                for row_id, message in rows:
+                    last_id = row_id
+                    callback(message)
+        finally:
+            self.subscribed.clear()
+            conn.close()
+
+
+class InvalidationBus:
+    """
+    Publishes cache invalidation events and applies events from other workers to the local AuthCache.
+    """
+    RETRY_DELAY = 1.0
+
+    def __init__(self, transport, cache):
+        self.transport = transport
+        self.cache = cache
+        self.origin = uuid.uuid4().hex
+        self.metrics = {
+            'published': 0,
+            'publish_errors': 0,
+            'received': 0,
+            'lag_last': 0.0,
+            'lag_max': 0.0,
+            'lag_total': 0.0,
+        }
+        self._stop = threading.Event()
+        self._thread = None
+
+    def publish(self, event_type, **data):
+        message = {'type': event_type, 'origin': self.origin, 'sent_at': time.time(), **data}
+        self.apply(message)
+
+        # The database stays authoritative, so a failed publish only delays eviction
+        # in other workers until their cache entries expire.
+        try:
+            self.transport.publish(json.dumps(message))
+            self.metrics['published'] += 1
+        except Exception:
+            self.metrics['publish_errors'] += 1
+
+    def apply(self, message):
+        if message['type'] == TOKEN_REVOKED:
+            self.cache.revoke_token(message['token'])
+        elif message['type'] == USER_CHANGED:
+            self.cache.evict_user(message['user_id'])
+
+    def receive(self, raw):
+        message = json.loads(raw)
+        if message.get('origin') == self.origin:
+            return
+
+        lag = max(0.0, time.time() - message['sent_at'])
+        self.metrics['received'] += 1
+        self.metrics['lag_last'] = lag
+        self.metrics['lag_max'] = max(self.metrics['lag_max'], lag)
+        self.metrics['lag_total'] += lag
+        self.apply(message)
+
+    def get_metrics(self):
+        metrics = dict(self.metrics)
+        metrics['lag_avg'] = metrics['lag_total'] / metrics['received'] if metrics['received'] else 0.0
+        metrics['transport'] = type(self.transport).__name__
+        metrics['subscribed'] = self.transport.subscribed.is_set()
+        return metrics
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.transport.listen(self.receive, self._stop)
+            except Exception:
+                self._stop.wait(self.RETRY_DELAY)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='invalidation-bus', daemon=True)
+        self._thread.start()
+
+    def wait_until_subscribed(self, timeout=None):
+        return self.transport.subscribed.wait(timeout)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+_bus = None
+_bus_pid = None
+_bus_lock = threading.Lock()
+
+
+def get_bus():
+    """
+    Return this process's bus, creating it (and its subscriber thread) on first use.
+    The pid check makes sure forked workers start their own subscriber.
+    """
+    global _bus, _bus_pid
+
+    pid = os.getpid()
+    if _bus is not None and _bus_pid == pid:
+        return _bus
+
+    with _bus_lock:
+        if _bus is None or _bus_pid != pid:
+            config = settings.INVALIDATION_BUS
+            transport = import_string(config['TRANSPORT'])(config)
+            cache = AuthCache(ttl=config.get('AUTH_CACHE_TTL', 0), max_size=config.get('AUTH_CACHE_MAX_SIZE', 10000))
+            _bus = InvalidationBus(transport, cache)
+            _bus.start()
+            _bus_pid = pid
+    return _bus
+
+
+def reset_bus():
+    global _bus, _bus_pid
+
+    with _bus_lock:
+        if _bus is not None:
+            _bus.stop()
+        _bus = None
+        _bus_pid = None
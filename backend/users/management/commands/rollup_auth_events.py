@@ -0,0 +1,152 @@
+# backend/users/management/commands/rollup_auth_events.py
+import json
+import os
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncMinute
+from django.utils import timezone
+from users.models import AuthEvent, AuthEventCounter, AuthEventRollup
+
+
+class Command(BaseCommand):
+    help = (
+        'Roll raw auth events up into per-minute AuthEventCounter rows. Progress is recorded per source '
+        '(AuthEventRollup), so the command can run at any interval and raw events are kept '
+        'unless --delete or --retention is passed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ndjson', metavar='PATH',
+            help='Roll up an NDJSONSink file instead of AuthEvent rows',
+        )
+        parser.add_argument(
+            '--delete', action='store_true',
+            help='Remove raw events once counted; an NDJSON file is rotated, drained and removed',
+        )
+        parser.add_argument(
+            '--retention', type=int, metavar='DAYS',
+            help='Database only: remove counted events older than DAYS',
+        )
+        parser.add_argument(
+            '--settle', type=float, metavar='SECONDS',
+            help='Database only: leave events this recent for the next run, since workers flush them '
+                 'late and out of order (default: AUTH_AUDIT FLUSH_INTERVAL + 60)',
+        )
+        parser.add_argument(
+            '--grace', type=float, default=1.0, metavar='SECONDS',
+            help='With --ndjson --delete: how long the rotated file must stop growing before removal',
+        )
+
+    def handle(self, *args, **options):
+        if options['ndjson']:
+            if options['retention'] is not None:
+                raise CommandError('--retention only applies to AuthEvent rows; use --delete with --ndjson')
+            counts = self.rollup_ndjson(options['ndjson'], options['delete'], options['grace'])
+        else:
+            settle = options['settle']
+            if settle is None:
+                settle = settings.AUTH_AUDIT.get('FLUSH_INTERVAL', 5.0) + 60
+            retention = 0 if options['delete'] else options['retention']
+            counts = self.rollup_database(timezone.now() - timedelta(seconds=settle), retention)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rolled up {sum(counts.values())} events into {len(counts)} minute counters'
+        ))
+
+    def rollup_database(self, cutoff, retention):
+        with transaction.atomic():
+            state, _ = AuthEventRollup.objects.select_for_update().get_or_create(source='database')
+
+            # Counted by created_at rather than id: ids from concurrent batches can commit out of order
+            events = AuthEvent.objects.filter(created_at__lt=cutoff)
+            if state.rolled_up_to is not None:
+                events = events.filter(created_at__gte=state.rolled_up_to)
+            rows = (
+                events.annotate(minute=TruncMinute('created_at', tzinfo=dt_timezone.utc))
+                .values('minute', 'event_type')
+                .annotate(count=Count('id'))
+                .order_by()
+            )
+            counts = Counter({(row['minute'], row['event_type']): row['count'] for row in rows})
+            self.add_counts(counts)
+
+            if state.rolled_up_to is None or cutoff > state.rolled_up_to:
+                state.rolled_up_to = cutoff
+                state.save(update_fields=['rolled_up_to'])
+
+            if retention is not None:
+                delete_before = min(state.rolled_up_to, timezone.now() - timedelta(days=retention))
+                AuthEvent.objects.filter(created_at__lt=delete_before).delete()
+        return counts
+
+    def rollup_ndjson(self, path, delete, grace):
+        if not os.path.exists(path):
+            raise CommandError(f'{path} does not exist')
+        source = os.path.abspath(path)[-255:]
+
+        with transaction.atomic():
+            state, _ = AuthEventRollup.objects.select_for_update().get_or_create(source=source)
+            offset = state.offset
+            if os.path.getsize(path) < offset:
+                # Truncated or replaced since the last run
+                offset = 0
+
+            if not delete:
+                counts, offset = self.read_ndjson(path, offset)
+            else:
+                # NDJSONSink reopens the file on every flush, so new events go to a fresh file.
+                # A flush that opened the old file before the rename can still append to it,
+                # so keep reading until it has stopped growing for `grace` seconds.
+                rotated = f'{path}.rollup-{int(time.time())}'
+                os.rename(path, rotated)
+                counts = Counter()
+                while True:
+                    size = os.path.getsize(rotated)
+                    more, offset = self.read_ndjson(rotated, offset)
+                    counts.update(more)
+                    time.sleep(grace)
+                    if os.path.getsize(rotated) == size:
+                        break
+                offset = 0
+
+            self.add_counts(counts)
+            state.offset = offset
+            state.save(update_fields=['offset'])
+
+        if delete:
+            os.remove(rotated)
+        return counts
+
+    def read_ndjson(self, path, offset):
+        """
+        Count events from `offset` to the last complete line; returns the counts and the new offset
+        """
+        counts = Counter()
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+        data = data[:data.rfind(b'\n') + 1]
+
+        for line in data.decode('utf-8').splitlines():
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            created_at = datetime.fromisoformat(event['created_at']).astimezone(dt_timezone.utc)
+            counts[(created_at.replace(second=0, microsecond=0), event['event_type'])] += 1
+        return counts, offset + len(data)
+
+    def add_counts(self, counts):
+        for (minute, event_type), count in counts.items():
+            # get_or_create falls back to reading the row when a concurrent run (e.g. the --ndjson
+            # one) inserts it first, instead of failing on unique_together; the lock orders the increments
+            counter, created = AuthEventCounter.objects.select_for_update().get_or_create(
+                minute=minute, event_type=event_type, defaults={'count': count}
+            )
+            if not created:
+                AuthEventCounter.objects.filter(pk=counter.pk).update(count=F('count') + count)
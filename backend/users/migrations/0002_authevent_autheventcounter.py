@@ -0,0 +1,36 @@
+# Generated by Django 5.2.1 on 2026-10-19 13:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('login', 'Login'), ('login_failed', 'Failed login'), ('refresh', 'Token refresh'), ('logout', 'Logout'), ('password_reset_request', 'Password reset request'), ('password_reset', 'Password reset'), ('email_verified', 'Email verification')], max_length=32)),
+                ('user_id', models.BigIntegerField(blank=True, null=True)),
+                ('email', models.CharField(blank=True, max_length=254)),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AuthEventCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('minute', models.DateTimeField()),
+                ('event_type', models.CharField(choices=[('login', 'Login'), ('login_failed', 'Failed login'), ('refresh', 'Token refresh'), ('logout', 'Logout'), ('password_reset_request', 'Password reset request'), ('password_reset', 'Password reset'), ('email_verified', 'Email verification')], max_length=32)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('minute', 'event_type')},
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.1 on 2026-10-19 14:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_authevent_autheventcounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthEventRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=255, unique=True)),
+                ('rolled_up_to', models.DateTimeField(blank=True, null=True)),
+                ('offset', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -45,4 +45,51 @@ class BlacklistedToken(models.Model):
 
     @classmethod
     def is_token_blacklisted(cls, token):
-        return cls.objects.filter(token=token).exists()
\ No newline at end of file
+        return cls.objects.filter(token=token).exists()
+
+class AuthEvent(models.Model):
+    LOGIN = 'login'
+    LOGIN_FAILED = 'login_failed'
+    REFRESH = 'refresh'
+    LOGOUT = 'logout'
+    PASSWORD_RESET_REQUEST = 'password_reset_request'
+    PASSWORD_RESET = 'password_reset'
+    EMAIL_VERIFIED = 'email_verified'
+    EVENT_TYPES = [
+        (LOGIN, 'Login'),
+        (LOGIN_FAILED, 'Failed login'),
+        (REFRESH, 'Token refresh'),
+        (LOGOUT, 'Logout'),
+        (PASSWORD_RESET_REQUEST, 'Password reset request'),
+        (PASSWORD_RESET, 'Password reset'),
+        (EMAIL_VERIFIED, 'Email verification'),
+    ]
+
+    event_type = models.CharField(max_length=32, choices=EVENT_TYPES)
+    # Plain ids: events are written in batches and outlive the users they mention
+    user_id = models.BigIntegerField(null=True, blank=True)
+    email = models.CharField(max_length=254, blank=True)
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
+    created_at = models.DateTimeField(db_index=True)
+
+
+class AuthEventCounter(models.Model):
+    """
+    Per-minute event counts rolled up from AuthEvent by `manage.py rollup_auth_events`
+    """
+    minute = models.DateTimeField()
+    event_type = models.CharField(max_length=32, choices=AuthEvent.EVENT_TYPES)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = [('minute', 'event_type')]
+
+
+class AuthEventRollup(models.Model):
+    """
+    How far `manage.py rollup_auth_events` has counted a source, so raw events can be kept
+    and rolled up again without counting them twice
+    """
+    source = models.CharField(max_length=255, unique=True)  # 'database' or an NDJSON file path
+    rolled_up_to = models.DateTimeField(null=True, blank=True)  # database: events created before this are counted
+    offset = models.BigIntegerField(default=0)  # NDJSON: bytes of the file already counted
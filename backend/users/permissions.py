@@ -6,14 +6,43 @@ class IsOwnerOrAdmin(permissions.BasePermission):
         if request.user.is_superuser:
             return True
             
-        if hasattr(obj, 'owner'):
-            return obj.owner == request.user
+        # Compare foreign key ids so the owner row is never loaded
+        if hasattr(obj, 'owner_id'):
+            return obj.owner_id == request.user.pk
             
         return obj == request.user
+        
+    def has_objects_permission(self, request, view, objs):
+        """
+        Batch form of has_object_permission for bulk operations
+        """
+        if request.user.is_superuser:
+            return True
+            
+        return all(self.has_object_permission(request, view, obj) for obj in objs)
 
 class IsAdminOrReadOnly(permissions.BasePermission):
     def has_permission(self, request, view):
         if request.method in permissions.SAFE_METHODS:
             return True
             
-        return request.user.is_superuser
\ No newline at end of file
+        return request.user.is_superuser
+
+class BulkObjectPermissionsMixin:
+    """
+    View mixin adding check_bulk_object_permissions(), the bulk counterpart of check_object_permissions().
+    Permissions without has_objects_permission are evaluated object by object.
+    """
+    def check_bulk_object_permissions(self, request, objs):
+        for permission in self.get_permissions():
+            if hasattr(permission, 'has_objects_permission'):
+                allowed = permission.has_objects_permission(request, self, objs)
+            else:
+                allowed = all(permission.has_object_permission(request, self, obj) for obj in objs)
+                
+            if not allowed:
+                self.permission_denied(
+                    request,
+                    message=getattr(permission, 'message', None),
+                    code=getattr(permission, 'code', None)
+                )
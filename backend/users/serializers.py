@@ -1,9 +1,52 @@
 # backend/users/serializers.py
+import hashlib
 from rest_framework import serializers
 from django.contrib.auth import authenticate
+from django.db import models
+from django.utils import timezone
 from .models import CustomUser, EmailVerificationToken, PasswordResetToken
 
-class UserSerializer(serializers.ModelSerializer):
+class ValuesSerializerMixin:
+    """
+    Read-only fast path for ModelSerializers whose Meta.fields are all concrete model fields.
+    Rows come straight from queryset.values() instead of model instances and field to_representation.
+    """
+    @classmethod
+    def get_values_lookups(cls, fields=None):
+        """
+        (name, attname, is_datetime) for Meta.fields, or for the `fields` subset of it
+        """
+        model = cls.Meta.model
+        lookups = []
+        for name in fields or cls.Meta.fields:
+            field = model._meta.get_field(name)
+            lookups.append((name, field.attname, isinstance(field, models.DateTimeField)))
+        return lookups
+        
+    @classmethod
+    def values_queryset(cls, queryset, fields=None):
+        # Only the selected columns are fetched
+        return queryset.values(*[attname for _, attname, _ in cls.get_values_lookups(fields)])
+        
+    @classmethod
+    def to_values_representation(cls, rows, fields=None):
+        lookups = cls.get_values_lookups(fields)
+        tz = timezone.get_current_timezone()
+        data = []
+        for row in rows:
+            item = {}
+            for name, attname, is_datetime in lookups:
+                value = row[attname]
+                # Match DateTimeField: ISO 8601 in the current timezone, UTC as 'Z'
+                if is_datetime and value is not None:
+                    value = value.astimezone(tz).isoformat()
+                    if value.endswith('+00:00'):
+                        value = value[:-6] + 'Z'
+                item[name] = value
+            data.append(item)
+        return data
+
+class UserSerializer(ValuesSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = CustomUser
         fields = ['id', 'email', 'is_email_verified', 'is_active', 'date_of_birth']
@@ -28,6 +71,8 @@ class LoginSerializer(serializers.Serializer):
             if not user.is_email_verified:
                 raise serializers.ValidationError('Email address not verified')
                 
+            data['user'] = user
+            
         return data
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -46,8 +91,21 @@ class RegisterSerializer(serializers.ModelSerializer):
         
     def create(self, validated_data):
         validated_data.pop('confirm_password')
-        user = CustomUser.objects.create_user(**validated_data, is_active=True)
+        username = self.get_username(validated_data['email'])
+        user = CustomUser.objects.create_user(username=username, **validated_data, is_active=True)
         return user
+        
+    @staticmethod
+    def get_username(email):
+        """
+        AbstractUser still requires a unique username: the email, which is unique too,
+        or for emails longer than username allows, a prefix of it plus a hash of the whole
+        """
+        max_length = CustomUser._meta.get_field('username').max_length
+        if len(email) <= max_length:
+            return email
+        digest = hashlib.sha256(email.encode()).hexdigest()[:32]
+        return f'{email[:max_length - len(digest) - 1]}-{digest}'
 
 class PasswordResetRequestSerializer(serializers.Serializer):
     email = serializers.EmailField()
@@ -0,0 +1,15 @@
+# backend/users/signals.py
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import CustomUser
+from .invalidation import get_bus, USER_CHANGED
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def publish_user_changed(sender, instance, **kwargs):
+    """
+    Evict the user from every worker's auth cache once the change is committed
+    """
+    user_id = str(instance.pk)
+    transaction.on_commit(lambda: get_bus().publish(USER_CHANGED, user_id=user_id))
@@ -1,3 +1,414 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+import time
+from collections import Counter
+from datetime import timedelta
+from unittest import mock
+from django.conf import settings
+from django.core import mail
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient, APITestCase
+from .audit import AuditLog, NDJSONSink, get_audit_log
+from .authentication import create_jwt_pair
+from .models import AuthEvent, AuthEventCounter, CustomUser, PasswordResetToken
+from .invalidation import (
+    AuthCache,
+    InvalidationBus,
+    SQLiteTransport,
+    TOKEN_REVOKED,
+    USER_CHANGED,
+    get_bus,
+    reset_bus,
+)
 
-# Create your tests here.
+
+class InvalidationBusTests(SimpleTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        config = {'SQLITE_PATH': os.path.join(self.tmpdir.name, 'bus.sqlite3'), 'POLL_INTERVAL': 0.05}
+        self.publisher = InvalidationBus(SQLiteTransport(config), AuthCache(ttl=60))
+        self.subscriber = InvalidationBus(SQLiteTransport(config), AuthCache(ttl=60))
+        self.subscriber.start()
+        # Events published before the subscriber records its starting position are not delivered
+        self.assertTrue(self.subscriber.wait_until_subscribed(timeout=5))
+
+    def tearDown(self):
+        self.subscriber.stop()
+        self.tmpdir.cleanup()
+
+    def wait_for(self, condition, timeout=5):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if condition():
+                return True
+            time.sleep(0.02)
+        return False
+
+    def test_token_revocation_reaches_other_worker(self):
+        self.subscriber.cache.add_token('abc', 1, time.time() + 300)
+        self.publisher.publish(TOKEN_REVOKED, token='abc')
+
+        self.assertTrue(self.wait_for(lambda: self.subscriber.cache.get_token('abc') is None))
+        metrics = self.subscriber.get_metrics()
+        self.assertEqual(metrics['received'], 1)
+        self.assertGreaterEqual(metrics['lag_max'], 0.0)
+
+    def test_user_change_evicts_cached_user(self):
+        user = CustomUser(pk=7, email='seven@example.com')
+        self.subscriber.cache.add_user(user)
+        self.publisher.publish(USER_CHANGED, user_id='7')
+
+        self.assertTrue(self.wait_for(lambda: self.subscriber.cache.get_user(7) is None))
+
+    def test_publisher_applies_event_locally(self):
+        self.publisher.cache.add_token('abc', 1, time.time() + 300)
+        self.publisher.publish(TOKEN_REVOKED, token='abc')
+
+        self.assertIsNone(self.publisher.cache.get_token('abc'))
+        self.assertEqual(self.publisher.get_metrics()['received'], 0)
+
+
+class AuthCacheTests(SimpleTestCase):
+    def test_disabled_cache_stores_nothing(self):
+        cache = AuthCache(ttl=0)
+        cache.add_token('abc', 1, time.time() + 300)
+        self.assertIsNone(cache.get_token('abc'))
+
+    def test_token_entry_never_outlives_token(self):
+        cache = AuthCache(ttl=60)
+        cache.add_token('abc', 1, time.time() - 1)
+        self.assertIsNone(cache.get_token('abc'))
+        # and is dropped, not just skipped
+        self.assertEqual(len(cache._tokens), 0)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = AuthCache(ttl=60, max_size=2)
+        for token in ('a', 'b'):
+            cache.add_token(token, 1, time.time() + 300)
+        cache.get_token('a')
+        cache.add_token('c', 1, time.time() + 300)
+        
+        self.assertIsNone(cache.get_token('b'))
+        self.assertEqual(cache.get_token('a'), '1')
+        self.assertEqual(cache.get_token('c'), '1')
+
+    def test_every_lookup_gets_its_own_user(self):
+        cache = AuthCache(ttl=60)
+        cache.add_user(CustomUser(pk=7, email='seven@example.com', is_active=True))
+        
+        first, second = cache.get_user(7), cache.get_user('7')
+        self.assertIsNot(first, second)
+        first.email = 'changed@example.com'
+        self.assertEqual(second.email, 'seven@example.com')
+        self.assertFalse(second._state.adding)
+
+
+class ListSink:
+    def __init__(self):
+        self.batches = []
+
+    def write(self, events):
+        self.batches.append(events)
+
+
+class AuditLogTests(SimpleTestCase):
+    def test_events_beyond_the_buffer_are_dropped_and_counted(self):
+        audit_log = AuditLog(ListSink(), max_buffer=3, flush_size=100)
+        for _ in range(5):
+            audit_log.record(AuthEvent.LOGIN_FAILED, email='a@example.com')
+
+        metrics = audit_log.get_metrics()
+        self.assertEqual(metrics['buffered'], 3)
+        self.assertEqual(metrics['dropped'], 2)
+
+    def test_flush_writes_one_batch(self):
+        sink = ListSink()
+        audit_log = AuditLog(sink, flush_size=100)
+        for _ in range(3):
+            audit_log.record(AuthEvent.LOGIN_FAILED, email='a@example.com')
+
+        self.assertEqual(audit_log.flush(), 3)
+        self.assertEqual(len(sink.batches), 1)
+        self.assertEqual(audit_log.get_metrics()['buffered'], 0)
+
+    def test_background_flush_on_size(self):
+        sink = ListSink()
+        audit_log = AuditLog(sink, flush_size=2, flush_interval=60)
+        audit_log.start()
+        try:
+            audit_log.record(AuthEvent.LOGIN_FAILED, email='a@example.com')
+            audit_log.record(AuthEvent.LOGIN_FAILED, email='b@example.com')
+            deadline = time.time() + 5
+            while not sink.batches and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            audit_log.stop()
+        self.assertEqual(sum(len(batch) for batch in sink.batches), 2)
+
+    def test_stop_flushes_remaining_events(self):
+        sink = ListSink()
+        audit_log = AuditLog(sink, flush_size=100, flush_interval=60)
+        audit_log.start()
+        audit_log.record(AuthEvent.LOGIN_FAILED, email='a@example.com')
+        audit_log.stop()
+        self.assertEqual(sum(len(batch) for batch in sink.batches), 1)
+
+    def test_ndjson_sink_appends_lines(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'events.ndjson')
+            audit_log = AuditLog(NDJSONSink({'NDJSON_PATH': path}))
+            audit_log.record(AuthEvent.LOGIN_FAILED, email='a@example.com')
+            audit_log.record(AuthEvent.LOGIN_FAILED, email='b@example.com')
+            audit_log.flush()
+
+            with open(path) as f:
+                events = [json.loads(line) for line in f]
+        self.assertEqual([event['email'] for event in events], ['a@example.com', 'b@example.com'])
+
+
+class RollupAuthEventsTests(TestCase):
+    def setUp(self):
+        self.output = open(os.devnull, 'w')
+        self.addCleanup(self.output.close)
+
+    def rollup(self, *args):
+        call_command('rollup_auth_events', *args, stdout=self.output)
+
+    def counts(self):
+        return dict(AuthEventCounter.objects.values_list('minute', 'count'))
+
+    def test_rollup_counts_each_event_once_and_keeps_raw_events(self):
+        minute = timezone.now().replace(second=0, microsecond=0) - timedelta(minutes=5)
+        AuthEvent.objects.bulk_create(
+            [AuthEvent(event_type=AuthEvent.LOGIN, created_at=minute + timedelta(seconds=i)) for i in range(3)]
+            + [AuthEvent(event_type=AuthEvent.LOGIN, created_at=minute + timedelta(minutes=1))]
+        )
+
+        self.rollup('--settle', '0')
+        recent = AuthEvent.objects.create(event_type=AuthEvent.LOGIN, created_at=timezone.now())
+        # Too recent: a worker may still be flushing events from the same moment
+        self.rollup()
+        self.rollup('--settle', '0')
+
+        recent_minute = recent.created_at.replace(second=0, microsecond=0)
+        expected = Counter({minute: 3, minute + timedelta(minutes=1): 1})
+        expected[recent_minute] += 1
+        self.assertEqual(self.counts(), dict(expected))
+        self.assertEqual(AuthEvent.objects.count(), 5)
+
+        self.rollup('--settle', '0', '--delete')
+        self.assertEqual(self.counts(), dict(expected))
+        self.assertFalse(AuthEvent.objects.exists())
+
+    def test_retention_only_removes_old_counted_events(self):
+        AuthEvent.objects.create(event_type=AuthEvent.LOGIN, created_at=timezone.now() - timedelta(days=10))
+        kept = AuthEvent.objects.create(event_type=AuthEvent.LOGIN, created_at=timezone.now() - timedelta(days=1))
+        # Too recent to be counted yet
+        uncounted = AuthEvent.objects.create(event_type=AuthEvent.LOGIN, created_at=timezone.now())
+
+        self.rollup('--retention', '7')
+        self.assertEqual(set(AuthEvent.objects.values_list('pk', flat=True)), {kept.pk, uncounted.pk})
+        self.assertEqual(sum(self.counts().values()), 2)
+
+    def test_ndjson_rollup_reads_new_lines_and_keeps_the_file(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        path = os.path.join(tmpdir.name, 'events.ndjson')
+        sink = NDJSONSink({'NDJSON_PATH': path})
+        minute = timezone.now().replace(second=0, microsecond=0)
+        event = {'event_type': AuthEvent.LOGIN, 'user_id': None, 'email': '', 'ip_address': None, 'created_at': minute}
+
+        sink.write([event, event])
+        self.rollup('--ndjson', path)
+        sink.write([event])
+        # A flush in progress: the partial line waits for the next run
+        with open(path, 'a') as f:
+            f.write('{"event_type": "login"')
+        self.rollup('--ndjson', path)
+        self.assertEqual(self.counts(), {minute: 3})
+        self.assertTrue(os.path.exists(path))
+
+        with open(path, 'a') as f:
+            f.write(f', "created_at": "{minute.isoformat()}"}}\n')
+        self.rollup('--ndjson', path, '--delete', '--grace', '0.05')
+        self.assertEqual(self.counts(), {minute: 4})
+        self.assertEqual(os.listdir(tmpdir.name), [])
+
+
+class JWTCSRFTests(APITestCase):
+    """
+    Cookie-authenticated unsafe requests need the CSRF header and a trusted Origin
+    """
+    databases = {'default', *settings.SHARD_DATABASES}
+
+    def setUp(self):
+        self.client = APIClient(enforce_csrf_checks=True)
+        CustomUser.objects.create_user(
+            username='csrf@example.com', email='csrf@example.com', password='pw', is_email_verified=True
+        )
+        response = self.client.post(reverse('auth-login'), {'email': 'csrf@example.com', 'password': 'pw'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        # Login only sets the refresh cookie; the SPA then fetches the access cookie
+        self.assertEqual(self.client.post(reverse('auth-refresh-token')).status_code, 200)
+        self.csrf_token = self.client.cookies[settings.CSRF_COOKIE_NAME].value
+        self.url = reverse('example-list')
+
+    def test_missing_csrf_header_is_rejected(self):
+        response = self.client.post(self.url, {'name': 'x', 'description': 'x'}, format='json')
+        self.assertEqual(response.status_code, 403)
+        self.assertIn('CSRF', response.data['detail'])
+
+    def test_spa_origins_are_trusted(self):
+        for origin in settings.CORS_ALLOWED_ORIGINS:
+            with self.subTest(origin=origin):
+                response = self.client.post(
+                    self.url, {'name': 'x', 'description': 'x'}, format='json',
+                    headers={'Origin': origin, settings.JWT_AUTH['JWT_CSRF_HEADER_NAME']: self.csrf_token},
+                )
+                self.assertEqual(response.status_code, 201)
+
+    def test_untrusted_origin_is_rejected(self):
+        response = self.client.post(
+            self.url, {'name': 'x', 'description': 'x'}, format='json',
+            headers={'Origin': 'http://evil.example', settings.JWT_AUTH['JWT_CSRF_HEADER_NAME']: self.csrf_token},
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_safe_requests_need_no_token(self):
+        self.assertEqual(self.client.get(reverse('current-user')).status_code, 200)
+
+
+@override_settings(INVALIDATION_BUS={**settings.INVALIDATION_BUS, 'AUTH_CACHE_TTL': 60})
+class CachedAuthenticationTests(APITestCase):
+    """
+    With AUTH_CACHE_TTL set, tokens and users come from the worker's cache until the bus evicts them
+    """
+    def setUp(self):
+        # get_bus() builds its cache from INVALIDATION_BUS on first use
+        reset_bus()
+        self.addCleanup(reset_bus)
+        self.user = CustomUser.objects.create_user(
+            username='cached@example.com', email='cached@example.com', password='pw', is_email_verified=True
+        )
+        self.access_token, refresh_token = create_jwt_pair(self.user)
+        self.client.cookies['access_token'] = self.access_token
+        self.client.cookies['refresh_token'] = refresh_token
+        
+        self.assertEqual(self.client.get(reverse('current-user')).status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(reverse('current-user')).status_code, 200)
+
+    def test_logout_revokes_the_cached_token(self):
+        self.assertEqual(self.client.post(reverse('auth-logout')).status_code, 200)
+        self.client.cookies['access_token'] = self.access_token
+        self.assertEqual(self.client.get(reverse('current-user')).status_code, 401)
+
+    def test_deactivated_user_is_rejected(self):
+        # USER_CHANGED is published once the save commits
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.assertEqual(self.client.get(reverse('current-user')).status_code, 401)
+
+
+class RecordedEventsMixin:
+    """
+    Sends the process-wide audit log to a ListSink for the duration of a test
+    """
+    def setUp(self):
+        super().setUp()
+        self.sink = ListSink()
+        patcher = mock.patch.object(get_audit_log(), 'sink', self.sink)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Drop what earlier tests left in the buffer
+        get_audit_log().flush()
+        self.sink.batches.clear()
+
+    def recorded_events(self, email):
+        get_audit_log().flush()
+        return [event['event_type'] for batch in self.sink.batches for event in batch if event['email'] == email]
+
+
+class LoginTests(RecordedEventsMixin, APITestCase):
+    def test_login_is_recorded(self):
+        CustomUser.objects.create_user(
+            username='login@example.com', email='login@example.com', password='pw', is_email_verified=True
+        )
+        response = self.client.post(reverse('auth-login'), {'email': 'login@example.com', 'password': 'pw'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.recorded_events('login@example.com'), [AuthEvent.LOGIN])
+
+    def test_failed_login_is_recorded(self):
+        response = self.client.post(reverse('auth-login'), {'email': 'nobody@example.com', 'password': 'pw'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.recorded_events('nobody@example.com'), [AuthEvent.LOGIN_FAILED])
+
+    def test_non_object_bodies_are_rejected(self):
+        for body in ([1, 2], 'email', 3):
+            with self.subTest(body=body):
+                response = self.client.post(reverse('auth-login'), body, format='json')
+                self.assertEqual(response.status_code, 400)
+
+
+class RegisterTests(APITestCase):
+    def register(self, email):
+        return self.client.post(reverse('auth-register'), {
+            'email': email, 'password': 'correct horse battery', 'confirm_password': 'correct horse battery',
+        }, format='json')
+
+    def test_email_is_the_username(self):
+        self.assertEqual(self.register('short@example.com').status_code, 201)
+        self.assertEqual(CustomUser.objects.get().username, 'short@example.com')
+
+    def test_longest_valid_email_fits_the_username(self):
+        domain = '.'.join(['d' * 63, 'e' * 63, 'f' * 57, 'com'])
+        emails = [f'{local}@{domain}' for local in ('a' * 64, 'a' * 63 + 'b')]
+        self.assertEqual(len(emails[0]), 254)
+        
+        for email in emails:
+            self.assertEqual(self.register(email).status_code, 201)
+        usernames = list(CustomUser.objects.values_list('username', flat=True))
+        self.assertEqual(len(set(usernames)), 2)
+        self.assertTrue(all(len(username) <= 150 for username in usernames))
+
+
+class PasswordResetTests(RecordedEventsMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = CustomUser.objects.create_user(
+            username='reset@example.com', email='reset@example.com', password='old password', is_email_verified=True
+        )
+
+    def test_reset_revokes_tokens_and_records_events(self):
+        response = self.client.post(reverse('password-reset-request-reset'), {'email': self.user.email}, format='json')
+        self.assertEqual(response.status_code, 200)
+        token = PasswordResetToken.objects.get(user=self.user).token
+        self.assertIn(f'/reset-password/{token}', mail.outbox[0].body)
+        
+        access_token, refresh_token = create_jwt_pair(self.user)
+        self.client.cookies['access_token'] = access_token
+        self.client.cookies['refresh_token'] = refresh_token
+        with mock.patch.object(get_bus(), 'publish', wraps=get_bus().publish) as publish:
+            response = self.client.post(reverse('password-reset-reset-password', args=[token]), {
+                'new_password': 'new password', 'confirm_password': 'new password',
+            }, format='json')
+        self.assertEqual(response.status_code, 200)
+        
+        publish.assert_any_call(TOKEN_REVOKED, token=access_token)
+        publish.assert_any_call(TOKEN_REVOKED, token=refresh_token)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('new password'))
+        self.assertFalse(PasswordResetToken.objects.exists())
+        self.assertEqual(self.recorded_events(self.user.email), [AuthEvent.PASSWORD_RESET_REQUEST, AuthEvent.PASSWORD_RESET])
+
+    def test_new_request_replaces_the_token(self):
+        for _ in range(2):
+            self.client.post(reverse('password-reset-request-reset'), {'email': self.user.email}, format='json')
+        token = PasswordResetToken.objects.get(user=self.user).token
+        self.assertIn(str(token), mail.outbox[1].body)
+        self.assertNotIn(str(token), mail.outbox[0].body)
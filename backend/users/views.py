@@ -1,12 +1,18 @@
 # backend/users/views.py
+import jwt
+from collections.abc import Mapping
+from datetime import datetime, timedelta
 from rest_framework import viewsets, status, generics
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
+from rest_framework.views import APIView
 from rest_framework.decorators import action
-from django.utils.crypto import get_random_string
+from rest_framework.exceptions import ValidationError
 from django.core.mail import send_mail
+from django.middleware.csrf import get_token
 from django.conf import settings
-from .models import CustomUser, EmailVerificationToken, PasswordResetToken, BlacklistedToken
+from django.utils import timezone
+from .models import CustomUser, EmailVerificationToken, PasswordResetToken, BlacklistedToken, AuthEvent
 from .serializers import (
     UserSerializer, 
     RegisterSerializer, 
@@ -16,6 +22,8 @@ from .serializers import (
     EmailVerificationSerializer
 )
 from .authentication import JWTAuthentication, create_jwt_pair
+from .invalidation import get_bus, TOKEN_REVOKED
+from .audit import record_event, get_audit_log
 
 class AuthViewSet(viewsets.GenericViewSet):
     permission_classes = [AllowAny]
@@ -27,13 +35,22 @@ class AuthViewSet(viewsets.GenericViewSet):
             return RegisterSerializer
         return UserSerializer
         
+    @action(detail=False, methods=['post'])
     def login(self, request):
         serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
+        if not serializer.is_valid():
+            # Any JSON body parses, not only objects; the serializer rejects the rest
+            email = request.data.get('email', '') if isinstance(request.data, Mapping) else ''
+            record_event(AuthEvent.LOGIN_FAILED, email=str(email)[:254], request=request)
+            raise ValidationError(serializer.errors)
         user = serializer.validated_data['user']
+        record_event(AuthEvent.LOGIN, user=user, request=request)
         
         access_token, refresh_token = create_jwt_pair(user)
         
+        # Issue the CSRF cookie the SPA echoes back in JWT_CSRF_HEADER_NAME
+        get_token(request)
+        
         response = Response({
             'user': UserSerializer(user).data,
             'message': 'Login successful'
@@ -51,18 +68,17 @@ class AuthViewSet(viewsets.GenericViewSet):
         
         return response
         
+    @action(detail=False, methods=['post'])
     def register(self, request):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
         
-        # Create verification token
-        token = get_random_string(64)
-        EmailVerificationToken.objects.create(
+        # Create verification token (a UUID, generated by the model)
+        token = EmailVerificationToken.objects.create(
             user=user,
-            token=token,
             expires_at=timezone.now() + timedelta(hours=24)
-        )
+        ).token
         
         # Send verification email
         verification_url = f"{settings.FRONTEND_URL}/verify-email/{token}"
@@ -88,13 +104,17 @@ class AuthViewSet(viewsets.GenericViewSet):
                 token=access_token,
                 expires_at=datetime.fromtimestamp(jwt.decode(access_token, options={'verify_signature': False})['exp'])
             )
+            get_bus().publish(TOKEN_REVOKED, token=access_token)
             
         if refresh_token:
             BlacklistedToken.objects.create(
                 token=refresh_token,
                 expires_at=datetime.fromtimestamp(jwt.decode(refresh_token, options={'verify_signature': False})['exp'])
             )
+            get_bus().publish(TOKEN_REVOKED, token=refresh_token)
             
+        record_event(AuthEvent.LOGOUT, user=request.user, request=request)
+        
         response = Response({'message': 'Logout successful'})
         response.delete_cookie('access_token')
         response.delete_cookie('refresh_token')
@@ -121,6 +141,7 @@ class AuthViewSet(viewsets.GenericViewSet):
             return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
             
         access_token, _ = create_jwt_pair(user)
+        record_event(AuthEvent.REFRESH, user=user, request=request)
         
         response = Response({'message': 'Token refreshed'})
         response.set_cookie(
@@ -141,6 +162,7 @@ class PasswordResetViewSet(viewsets.GenericViewSet):
             return PasswordResetRequestSerializer
         return PasswordResetSerializer
         
+    @action(detail=False, methods=['post'])
     def request_reset(self, request):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -151,14 +173,14 @@ class PasswordResetViewSet(viewsets.GenericViewSet):
         except CustomUser.DoesNotExist:
             return Response({'message': 'If this email exists in our system, you will receive a reset link'})
             
-        # Generate token and send email
-        token = get_random_string(64)
-        expires_at = timezone.now() + timedelta(hours=6)
-        
-        PasswordResetToken.objects.update_or_create(
+        # Replace any earlier token with a new one (a UUID, generated by the model) and send email
+        PasswordResetToken.objects.filter(user=user).delete()
+        token = PasswordResetToken.objects.create(
             user=user,
-            defaults={'token': token, 'expires_at': expires_at}
-        )
+            expires_at=timezone.now() + timedelta(hours=6)
+        ).token
+        
+        record_event(AuthEvent.PASSWORD_RESET_REQUEST, user=user, request=request)
         
         reset_url = f"{settings.FRONTEND_URL}/reset-password/{token}"
         send_mail(
@@ -171,6 +193,8 @@ class PasswordResetViewSet(viewsets.GenericViewSet):
         
         return Response({'message': 'If this email exists in our system, you will receive a reset link'})
         
+    # Same pattern as the <uuid:token> path converter used for email verification
+    @action(detail=False, methods=['post'], url_path=r'(?P<token>[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})')
     def reset_password(self, request, token=None):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -188,19 +212,25 @@ class PasswordResetViewSet(viewsets.GenericViewSet):
         user.save()
         
         reset_token.delete()
+        record_event(AuthEvent.PASSWORD_RESET, user=user, request=request)
         
         # Invalidate existing tokens
         access_token = request.COOKIES.get('access_token')
         refresh_token = request.COOKIES.get('refresh_token')
         
-        BlacklistedToken.objects.create(
-            token=access_token,
-            expires_at=datetime.fromtimestamp(jwt.decode(access_token, options={'verify_signature': False})['exp'])
-        )
-        BlacklistedToken.objects.create(
-            token=refresh_token,
-            expires_at=datetime.fromtimestamp(jwt.decode(refresh_token, options={'verify_signature': False})['exp'])
-        )
+        if access_token:
+            BlacklistedToken.objects.create(
+                token=access_token,
+                expires_at=datetime.fromtimestamp(jwt.decode(access_token, options={'verify_signature': False})['exp'])
+            )
+            get_bus().publish(TOKEN_REVOKED, token=access_token)
+            
+        if refresh_token:
+            BlacklistedToken.objects.create(
+                token=refresh_token,
+                expires_at=datetime.fromtimestamp(jwt.decode(refresh_token, options={'verify_signature': False})['exp'])
+            )
+            get_bus().publish(TOKEN_REVOKED, token=refresh_token)
         
         return Response({'message': 'Password successfully reset'})
 
@@ -222,6 +252,7 @@ class EmailVerificationView(generics.GenericAPIView):
         user.save()
         
         verification_token.delete()
+        record_event(AuthEvent.EMAIL_VERIFIED, user=user, request=request)
         
         return Response({'message': 'Email successfully verified'})
 
@@ -231,4 +262,22 @@ class CurrentUserView(generics.RetrieveAPIView):
     permission_classes = [IsAuthenticated]
     
     def get_object(self):
-        return self.request.user
\ No newline at end of file
+        return self.request.user
+
+class InvalidationMetricsView(APIView):
+    """
+    Invalidation bus counters and propagation lag (seconds) for this worker
+    """
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        return Response(get_bus().get_metrics())
+
+class AuditMetricsView(APIView):
+    """
+    Auth audit buffer counters (recorded, dropped, flushed) for this worker
+    """
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        return Response(get_audit_log().get_metrics())
\ No newline at end of file
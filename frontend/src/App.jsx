@@ -18,6 +18,10 @@ import VerifyEmail from "./pages/VerifyEmail";
 import Dashboard from "./pages/Dashboard";
 import Profile from "./pages/Profile";
 
+// Echo Django's CSRF cookie back on unsafe requests (JWT_CSRF_* settings)
+axios.defaults.xsrfCookieName = "csrftoken";
+axios.defaults.xsrfHeaderName = "X-CSRFToken";
+
 // Auth context
 const AuthContext = React.createContext();
 